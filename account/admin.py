@@ -1,8 +1,50 @@
 from django.contrib import admin
 from account.models import User, PasswordResetOTP
-from account.models import Subscription, SubscriptionPlan
+from account.models import Subscription, SubscriptionPlan, WebhookEvent
 
-admin.site.register(User)
-admin.site.register(PasswordResetOTP)
-admin.site.register(Subscription)
-admin.site.register(SubscriptionPlan)
\ No newline at end of file
+
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    list_display = ['email', 'username', 'first_name', 'last_name', 'is_staff', 'is_active', 'date_joined']
+    list_filter = ['is_staff', 'is_active']
+    search_fields = ['email', 'username', 'first_name', 'last_name']
+    readonly_fields = ['id', 'date_joined', 'last_login']
+    list_per_page = 50
+
+
+@admin.register(PasswordResetOTP)
+class PasswordResetOTPAdmin(admin.ModelAdmin):
+    list_display = ['user', 'attempts', 'used', 'jti_used', 'expires_at']
+    list_filter = ['used', 'jti_used']
+    search_fields = ['user__email']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    list_per_page = 50
+
+
+@admin.register(Subscription)
+class SubscriptionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'plan', 'status', 'next_payment_date', 'created_at']
+    list_filter = ['status', 'plan']
+    search_fields = ['user__email', 'paystack_subscription_id']
+    readonly_fields = ['id', 'created_at', 'updated_at']
+    list_select_related = ['user', 'plan']
+    raw_id_fields = ['user']
+    list_per_page = 50
+
+
+@admin.register(SubscriptionPlan)
+class SubscriptionPlanAdmin(admin.ModelAdmin):
+    list_display = ['name', 'paystack_plan_id', 'amount', 'interval', 'is_active']
+    list_filter = ['interval', 'is_active']
+    search_fields = ['name', 'paystack_plan_id']
+    readonly_fields = ['id', 'created_at']
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'event_type', 'created_at']
+    list_filter = ['event_type']
+    search_fields = ['event_id']
+    readonly_fields = ['created_at']
+    list_per_page = 50
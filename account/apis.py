@@ -1,14 +1,13 @@
 import logging
-from datetime import timedelta
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
 from django.utils.timezone import now
-from django.utils.encoding import force_str
-import resend
-import os
 from django.conf import settings
-from django.conf import settings
-from django.db import transaction
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.core.cache import cache
 
 import jwt
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -19,12 +18,33 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiExample
 
-from account.utils import OTPVerifyThrottle, create_or_replace_otp
+from dally.exceptions import flat_validation_errors
+
+from account.utils import (
+    ACTIVE_PLANS_CACHE_KEY,
+    PLAN_CACHE_TIMEOUT,
+    RESET_TOKEN_LIFETIME,
+    REPLICA_DB_ALIAS,
+    OTPVerifyThrottle,
+    RegisterThrottle,
+    create_or_replace_otp,
+    get_user_by_email_cached,
+    get_user_by_pk_cached,
+    invalidate_cached_users,
+    reset_jti_cache_key,
+)
+from account.tasks import (
+    send_welcome_email,
+    send_password_reset_otp,
+    process_password_reset,
+    process_paystack_event,
+)
 
 from .serializers import (
     ChangePasswordSerializer, 
     PasswordOTPVerifySerializer, 
     UserRegistrationSerializer, 
+    BulkUserRegistrationSerializer,
     PasswordResetRequestSerializer, 
     PasswordResetSerializer,
     UserProfileSerializer,
@@ -32,15 +52,27 @@ from .serializers import (
     SubscriptionPlanSerializer
 )
 from bookkeeping.models import Business
-from account.models import PasswordResetOTP, User, Subscription, SubscriptionPlan
+from account.models import User, Subscription, SubscriptionPlan
 from .services.paystack import PaystackService
-import hmac
-import hashlib
-import json
+from .permissions import IsAdmin
+import orjson
 
 # prepare logging handler for this file
 logger = logging.getLogger(__name__)
 
+# concurrent argon2 hashes in bulk_register, 64 MiB of memory each
+BULK_HASH_WORKERS = 4
+
+# settings read once at import; none of these change at runtime
+_DEBUG = settings.DEBUG
+_INTERNAL_JWT_SECRET = settings.INTERNAL_JWT_SECRET
+
+# reset token signing, prepared once instead of on every request
+_reset_jws = jwt.PyJWS()
+_reset_jwt_key = jwt.algorithms.HMACAlgorithm(
+    jwt.algorithms.HMACAlgorithm.SHA256
+).prepare_key(_INTERNAL_JWT_SECRET)
+
 @extend_schema(
     summary="Register new user",
     description="Register a new user account and automatically create their business. Returns user details and JWT tokens.",
@@ -98,6 +130,7 @@ logger = logging.getLogger(__name__)
 )
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterThrottle])
 def register(request):
     """
     Register a new user and create their business
@@ -114,81 +147,160 @@ def register(request):
     }
     """
     serializer = UserRegistrationSerializer(data=request.data)
-    
-    if serializer.is_valid():
-        try:
-            # Use transaction to ensure both user and business are created together
-            with transaction.atomic():
-                # Create user (use email as username)
-                user = User.objects.create_user(
-                    username=serializer.validated_data['email'],
-                    email=serializer.validated_data['email'],
-                    password=serializer.validated_data['password'],
-                    first_name=serializer.validated_data.get('first_name', ''),
-                    last_name=serializer.validated_data.get('last_name', '')
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    try:
+        # Use transaction to ensure both user and business are created together.
+        # It keeps its savepoint when nested (ATOMIC_REQUESTS, tests), so the
+        # IntegrityError below only rolls back this block
+        with transaction.atomic():
+            # Create user (use email as username)
+            user = User.objects.create_user(
+                username=data['email'],
+                email=data['email'],
+                password=data['password'],
+                first_name=data.get('first_name', ''),
+                last_name=data.get('last_name', '')
+            )
+            
+            # Create business for the user (Optional)
+            business = None
+            if data.get('business_name'):
+                business = Business.objects.create(
+                    user=user,
+                    name=data['business_name'],
+                    description=data.get('business_description', '')
                 )
-                
-                # Create business for the user (Optional)
-                business = None
-                if serializer.validated_data.get('business_name'):
-                    business = Business.objects.create(
-                        user=user,
-                        name=serializer.validated_data['business_name'],
-                        description=serializer.validated_data.get('business_description', '')
-                    )
-                
-                # Generate JWT tokens
-                refresh = RefreshToken.for_user(user)
-                
-                # Send welcome email (optional)
-                try:
-                    resend.api_key = os.environ.get('RESEND_API_KEY', getattr(settings, 'RESEND_API_KEY', None))
-                    resend.Emails.send({
-                        "from": "onboarding@resend.dev",
-                        "to": user.email,
-                        "subject": "Welcome to Dally Bookkeeping!",
-                        "html": f"""
-                            <p>Hello {user.first_name or 'there'},</p>
-                            <p>Welcome to Dally Bookkeeping! Your account has been successfully created.</p>
-                            {f'<p><b>Business:</b> {business.name}<br/>' if business else ''}
-                            <b>Email:</b> {user.email}</p>
-                            <p>You can now log in using your email address and start managing your bookkeeping records.</p>
-                            <p>Best regards,<br/>Dally Bookkeeping Team</p>
-                        """
-                    })
-                    logger.info(f"Resend: Email sent to {user.email} successfully!")
-                except Exception as e:
-                    logger.warning(f"Resend: Sending email failed for {user.email}: {e}")
-                
-                logger.info(f"Account for {user.email} has been created successfully")
-                return Response({
-                    'status': 'success',
-                    'user': {
-                        'id': user.id,
-                        'username': user.username,
-                        'email': user.email,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name
-                    },
-                    'business': {
-                        'id': str(business.id),
-                        'name': business.name,
-                        'description': business.description
-                    } if business else None,
-                    'tokens': {
-                        'access': str(refresh.access_token),
-                        'refresh': str(refresh)
-                    }
-                }, status=status.HTTP_201_CREATED)
-                
-        except Exception as e:
-            logger.error(f"Failed to create user account. error {e}")
+            
+            # Generate JWT tokens, signing each one exactly once
+            refresh = RefreshToken.for_user(user)
+            access_token = str(refresh.access_token)
+            refresh_token = str(refresh)
+            
+            # Send welcome email (optional) once the user row is committed;
+            # robust so a broker failure is logged instead of failing a signup
+            # whose account already exists
+            transaction.on_commit(lambda: send_welcome_email.delay(str(user.id)), robust=True)
+            
+            logger.info("Account for %s has been created successfully", user.email)
             return Response({
-                'status': 'error',
-                'detail': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'status': 'success',
+                'user': {
+                    'id': user.id,
+                    'username': user.username,
+                    'email': user.email,
+                    'first_name': user.first_name,
+                    'last_name': user.last_name
+                },
+                'business': {
+                    'id': business.id,
+                    'name': business.name,
+                    'description': business.description
+                } if business else None,
+                'tokens': {
+                    'access': access_token,
+                    'refresh': refresh_token
+                }
+            }, status=status.HTTP_201_CREATED)
+            
+    except IntegrityError:
+        # email/username unique constraint; covers concurrent signups too
+        return Response({
+            'email': ['Email already registered.']
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error("Failed to create user account. error %s", e)
+        return Response({
+            'status': 'error',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@extend_schema(
+    summary="Bulk register users",
+    description="Admin only. Register many users (and their optional businesses) in one request, e.g. from a CSV import.",
+    tags=["auth"],
+    request=BulkUserRegistrationSerializer,
+    responses={
+        201: {
+            'type': 'object',
+            'properties': {
+                'status': {'type': 'string'},
+                'users_created': {'type': 'integer'},
+                'businesses_created': {'type': 'integer'},
+                'users': {'type': 'array', 'items': {'type': 'object'}}
+            }
+        },
+        400: {'description': 'Validation error'}
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def bulk_register(request):
+    """
+    Register many users at once
     
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    POST /api/auth/register/bulk/
+    {
+        "users": [
+            {
+                "email": "john@example.com",
+                "password": "SecurePass123",
+                "password_confirm": "SecurePass123",
+                "business_name": "John's Trading"
+            }
+        ]
+    }
+    """
+    serializer = BulkUserRegistrationSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    rows = serializer.validated_data['users']
+
+    # Password hashing is the expensive part; argon2 releases the GIL.
+    # Each hash holds argon2's memory_cost, so the pool stays small.
+    with ThreadPoolExecutor(max_workers=BULK_HASH_WORKERS) as executor:
+        hashed_passwords = list(executor.map(make_password, (row['password'] for row in rows)))
+
+    users = []
+    businesses = []
+    for row, hashed_password in zip(rows, hashed_passwords):
+        # emails were normalized by the serializer
+        user = User(
+            username=row['email'],
+            email=row['email'],
+            password=hashed_password,
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', '')
+        )
+        users.append(user)
+        if row.get('business_name'):
+            businesses.append(Business(
+                user=user,
+                name=row['business_name'],
+                description=row.get('business_description', '')
+            ))
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=500)
+            Business.objects.bulk_create(businesses, batch_size=500)
+    except IntegrityError:
+        # an account created after the serializer's check (e.g. a concurrent signup)
+        return Response({
+            'users': ['One or more emails are already registered.']
+        }, status=status.HTTP_400_BAD_REQUEST)
+    # bulk_create sends no post_save, so clear any cached "no such user"
+    invalidate_cached_users(users)
+
+    logger.info("Bulk registration created %d accounts", len(users))
+    return Response({
+        'status': 'success',
+        'users_created': len(users),
+        'businesses_created': len(businesses),
+        'users': [{'id': user.id, 'email': user.email} for user in users],
+    }, status=status.HTTP_201_CREATED)
 
 
 @extend_schema(
@@ -225,61 +337,30 @@ def password_reset_request(request):
     }
     """
     serializer = PasswordResetRequestSerializer(data=request.data)
-    
-    if serializer.is_valid():
-        email = serializer.validated_data['email']
-        
-        # Get user by email
-        try:
-            user = User.objects.get(email=email)
+    serializer.is_valid(raise_exception=True)
+
+    email = serializer.validated_data['email']
+
+    # For development/testing, create the pin inline and return it
+    if _DEBUG:
+        user = get_user_by_email_cached(email)
+        if user is not None:
             otp = create_or_replace_otp(user)
-            # Send password reset email
-            try:
-                resend.api_key = os.environ.get('RESEND_API_KEY', getattr(settings, 'RESEND_API_KEY', None))
-                resend.Emails.send({
-                    "from": "onboarding@resend.dev",
-                    "to": email,
-                    "subject": "Password Reset Request - Dally Bookkeeping",
-                    "html": f"""
-                        <p>Hello {user.username},</p>
-                        <p>You have requested to reset your password for your Dally Bookkeeping account.</p>
-                        <p><b>Here is your six (6) digit pin:</b></p>
-                        <h2>{otp}</h2>
-                        <p>This pin will expire in 10 mins.</p>
-                        <p>If you did not request this password reset, please ignore this email.</p>
-                        <p>Best regards,<br/>Dally Bookkeeping Team</p>
-                    """
-                })
-                email_sent = True
-                logger.info(f"Resend: Reset password pin sent to {email}")
-            except Exception as e:
-                logger.error(f"Resend: Could not send email: {e}")
-                email_sent = False
-            
-            # For development/testing, also return the reset link
-            if settings.DEBUG:
-                return Response({
-                    'status': 'Success!',
-                    'otp': otp,
-                    'email_sent': email_sent,
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response({
-                    "status": "success",
-                    'message': 'If an account exists with this email, a password reset pin has been sent.'
-                }, status=status.HTTP_200_OK)
-                
-        except User.DoesNotExist:
-            # Don't reveal that the user doesn't exist
-            pass
-        
-        # Always return success to prevent email enumeration
-        return Response({
-            "status": "success",
-            'message': 'If an account exists with this email, a password reset pin has been sent.'
-        }, status=status.HTTP_200_OK)
-    
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            send_password_reset_otp.delay(str(user.id), otp)
+            return Response({
+                'status': 'Success!',
+                'otp': otp,
+            }, status=status.HTTP_200_OK)
+    else:
+        # Lookup, pin creation and email all happen in the worker so the
+        # response time is the same whether or not the account exists
+        process_password_reset.delay(email)
+
+    # Always return success to prevent email enumeration
+    return Response({
+        "status": "success",
+        'message': 'If an account exists with this email, a password reset pin has been sent.'
+    }, status=status.HTTP_200_OK)
 
 
 
@@ -318,25 +399,30 @@ def password_otp_verify(request):
     }
     """
     serializer = PasswordOTPVerifySerializer(data=request.data)
-    
-    if serializer.is_valid():
-        user_and_token = serializer.save()
-        reset_token = jwt.encode(
-        {
+    serializer.is_valid(raise_exception=True)
+
+    user_and_token = serializer.save()
+    reset_token = _reset_jws.encode(
+        orjson.dumps({
             "email": user_and_token['user'].email,
             "purpose": "password_reset",
             "jti": user_and_token['jti'],
-            "exp": now() + timedelta(minutes=10)
-        },
-        settings.INTERNAL_JWT_SECRET,
-        algorithm="HS256"
+            "exp": int(now().timestamp()) + RESET_TOKEN_LIFETIME
+        }),
+        _reset_jwt_key,
+        algorithm="HS256",
+        headers={"typ": "JWT"}
     )
-        return Response({
-            'message': 'success',
-            'reset_token': reset_token
-        }, status=status.HTTP_200_OK)
-    
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    # Remember the claims so password_reset_confirm can skip the DB lookup
+    cache.set(reset_jti_cache_key(user_and_token['jti']), {
+        'user_id': str(user_and_token['user'].pk),
+        'email': user_and_token['user'].email,
+        'record_id': user_and_token['record_id'],
+    }, timeout=RESET_TOKEN_LIFETIME)
+    return Response({
+        'message': 'success',
+        'reset_token': reset_token
+    }, status=status.HTTP_200_OK)
 
 
 
@@ -362,6 +448,7 @@ def password_otp_verify(request):
         400: {'description': 'Invalid token or passwords do not match'}
     }
 )
+@flat_validation_errors
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def password_reset_confirm(request):
@@ -376,22 +463,12 @@ def password_reset_confirm(request):
     }
     """
     serializer = PasswordResetSerializer(data=request.data)
-    
-    if serializer.is_valid():
-        serializer.save()
-        return Response({
-            'message': 'Password has been reset successfully.'
-        }, status=status.HTTP_200_OK)
-    
-    error_message = None
-    if 'non_field_errors' in serializer.errors:
-        error_message = ' '.join(serializer.errors['non_field_errors'])
-    elif serializer.errors:
-        first_key = next(iter(serializer.errors))
-        error_message = ' '.join(serializer.errors[first_key])
-    else:
-        error_message = 'Invalid input.'
-    return Response({"status": "error", "message": error_message}, status=status.HTTP_400_BAD_REQUEST)
+    serializer.is_valid(raise_exception=True)
+
+    serializer.save()
+    return Response({
+        'message': 'Password has been reset successfully.'
+    }, status=status.HTTP_200_OK)
 
 
 @extend_schema(
@@ -416,6 +493,7 @@ def password_reset_confirm(request):
         401: {'description': 'Authentication required'}
     }
 )
+@flat_validation_errors
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def change_password(request):
@@ -435,22 +513,12 @@ def change_password(request):
         data=request.data,
         context={'request': request}
     )
-    
-    if serializer.is_valid():
-        serializer.save()
-        return Response({
-            'message': 'Password changed successfully.'
-        }, status=status.HTTP_200_OK)
-    
-    error_message = None
-    if 'non_field_errors' in serializer.errors:
-        error_message = ' '.join(serializer.errors['non_field_errors'])
-    elif serializer.errors:
-        first_key = next(iter(serializer.errors))
-        error_message = ' '.join(serializer.errors[first_key])
-    else:
-        error_message = 'Invalid input.'
-    return Response({"status": "error", "message": error_message}, status=status.HTTP_400_BAD_REQUEST)
+    serializer.is_valid(raise_exception=True)
+
+    serializer.save()
+    return Response({
+        'message': 'Password changed successfully.'
+    }, status=status.HTTP_200_OK)
 
 
 @extend_schema(
@@ -485,8 +553,14 @@ def password_reset_verify(request, uid, token):
     Returns whether the token is valid without consuming it
     """
     try:
-        uid_decoded = force_str(urlsafe_base64_decode(uid))
-        user = User.objects.get(pk=uid_decoded)
+        # uids encode the user's UUID primary key; this check only reads,
+        # so it can be served by the replica (and unknown uids from cache);
+        # the password hash the token covers is not cached and loads on access
+        user = get_user_by_pk_cached(
+            uuid.UUID(urlsafe_base64_decode(uid).decode()), using=REPLICA_DB_ALIAS
+        )
+        if user is None:
+            raise User.DoesNotExist
         
         if default_token_generator.check_token(user, token):
             return Response({
@@ -515,9 +589,12 @@ def password_reset_verify(request, uid, token):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def list_plans(request):
-    plans = SubscriptionPlan.objects.filter(is_active=True)
-    serializer = SubscriptionPlanSerializer(plans, many=True)
-    return Response(serializer.data)
+    data = cache.get(ACTIVE_PLANS_CACHE_KEY)
+    if data is None:
+        plans = SubscriptionPlan.objects.filter(is_active=True)
+        data = SubscriptionPlanSerializer(plans, many=True).data
+        cache.set(ACTIVE_PLANS_CACHE_KEY, data, PLAN_CACHE_TIMEOUT)
+    return Response(data)
 
 
 @extend_schema(
@@ -529,7 +606,13 @@ def list_plans(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def subscription_status(request):
-    subscription = getattr(request.user, 'subscription', None)
+    # one JOIN instead of lazy subscription and plan lookups
+    subscription = (
+        Subscription.objects
+        .select_related('plan')
+        .filter(user=request.user)
+        .first()
+    )
     if not subscription:
         return Response({
             'is_pro': False,
@@ -538,7 +621,7 @@ def subscription_status(request):
         })
     
     return Response({
-        'is_pro': request.user.is_pro,
+        'is_pro': subscription.status == 'active',
         'status': subscription.status,
         'plan': subscription.plan.name if subscription.plan else None,
         'next_payment_date': subscription.next_payment_date
@@ -556,13 +639,14 @@ def subscription_status(request):
 @permission_classes([IsAuthenticated])
 def initialize_subscription(request):
     serializer = SubscriptionInitSerializer(data=request.data)
-    if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    serializer.is_valid(raise_exception=True)
     
     plan_id = serializer.validated_data.get('plan_id')
     
     try:
-        plan = SubscriptionPlan.objects.get(id=plan_id)
+        plan = SubscriptionPlan.objects.only(
+            'id', 'amount', 'paystack_plan_id', 'is_active'
+        ).get(id=plan_id)
     except SubscriptionPlan.DoesNotExist:
         return Response({"error": "Plan not found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -608,65 +692,17 @@ def paystack_webhook(request):
         return Response(status=status.HTTP_401_UNAUTHORIZED)
 
     # Verify signature
-    computed_signature = hmac.new(
-        settings.PAYSTACK_SECRET_KEY.encode('utf-8'),
-        payload,
-        hashlib.sha512
-    ).hexdigest()
-    
-    if computed_signature != signature:
+    if not PaystackService.verify_signature(payload, signature):
         return Response(status=status.HTTP_401_UNAUTHORIZED)
 
-    event_data = json.loads(payload)
-    event_type = event_data.get('event')
-    
-    # Process events
-    if event_type == 'subscription.create':
-        data = event_data['data']
-        email = data['customer']['email']
-        try:
-            user = User.objects.get(email=email)
-            plan_code = data['plan']['plan_code']
-            plan = SubscriptionPlan.objects.get(paystack_plan_id=plan_code)
-            
-            subscription, created = Subscription.objects.get_or_create(user=user)
-            subscription.plan = plan
-            subscription.paystack_subscription_id = data['subscription_code']
-            subscription.paystack_email_token = data['email_token']
-            subscription.status = 'active'
-            subscription.next_payment_date = data['next_payment_date']
-            subscription.save()
-            
-            logger.info(f"Subscription created for {user.email}")
-        except (User.DoesNotExist, SubscriptionPlan.DoesNotExist):
-            pass
-
-    elif event_type in ['subscription.disable', 'subscription.not_renewing']:
-        data = event_data['data']
-        sub_code = data['subscription_code']
-        try:
-            subscription = Subscription.objects.get(paystack_subscription_id=sub_code)
-            subscription.status = 'cancelled' if event_type == 'subscription.disable' else 'non-renewing'
-            subscription.save()
-        except Subscription.DoesNotExist:
-            pass
-            
-    # Handle direct payment success (charge.success) for non-plan payments or renewals
-    elif event_type == 'charge.success':
-        data = event_data['data']
-        if data.get('plan'): # If it's a plan payment
-            email = data['customer']['email']
-            try:
-                user = User.objects.get(email=email)
-                plan_code = data['plan']['plan_code']
-                plan = SubscriptionPlan.objects.get(paystack_plan_id=plan_code)
-                
-                subscription, created = Subscription.objects.get_or_create(user=user)
-                subscription.plan = plan
-                subscription.status = 'active'
-                subscription.save()
-            except (User.DoesNotExist, SubscriptionPlan.DoesNotExist):
-                pass
+    # Paystack sends UTF-8 JSON; anything else cannot be an event we handle
+    try:
+        body = payload.decode('utf-8')
+    except UnicodeDecodeError:
+        return Response(status=status.HTTP_400_BAD_REQUEST)
+
+    # Ack straight away; the event is applied by a worker
+    process_paystack_event.delay(body, signature)
 
     return Response(status=status.HTTP_200_OK)
 
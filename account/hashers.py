@@ -0,0 +1,11 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with a lower time cost than Django's default, keeping
+    register/login fast while staying memory-hard.
+    """
+    time_cost = 2
+    memory_cost = 65536  # KiB (64 MiB)
+    parallelism = 1
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_subscriptionplan_is_active'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='passwordresetotp',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:41
+
+import dally.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0006_passwordresetotp_expires_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subscription',
+            name='id',
+            field=models.UUIDField(default=dally.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='subscriptionplan',
+            name='id',
+            field=models.UUIDField(default=dally.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(default=dally.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
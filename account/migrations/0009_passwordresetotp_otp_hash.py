@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0008_webhookevent'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='passwordresetotp',
+            old_name='otp',
+            new_name='otp_hash',
+        ),
+        migrations.AlterField(
+            model_name='passwordresetotp',
+            name='otp_hash',
+            field=models.CharField(max_length=64),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_passwordresetotp_otp_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subscription',
+            name='paystack_subscription_id',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresetotp',
+            index=models.Index(condition=models.Q(('reset_jti__isnull', False)), fields=['reset_jti'], name='pwreset_jti_active'),
+        ),
+    ]
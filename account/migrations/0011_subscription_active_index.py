@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0010_reset_jti_and_subscription_code_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['status'], name='sub_active_partial'),
+        ),
+    ]
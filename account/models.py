@@ -1,10 +1,12 @@
-import uuid
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
 from django.contrib.auth.base_user import BaseUserManager
 
+from dally.ids import uuid7
+
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -31,29 +33,41 @@ class UserManager(BaseUserManager):
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
     objects = UserManager()
 
-    @property
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # signup charts group by date_joined; the admin user list
+            # seeks on (date_joined, id) for keyset pagination
+            models.Index(fields=['date_joined', 'id']),
+        ]
+
+    @cached_property
     def is_pro(self):
         """
-        Check if user has an active pro subscription
+        Check if user has an active pro subscription.
+        Computed once per instance, so permission checks and views reading it
+        during the same request share one lookup. Querysets that list users
+        and read this should select_related('subscription').
         """
-        subscription = getattr(self, 'subscription', None)
-        if subscription and subscription.status == 'active':
-            return True
-        return False
+        # reuse the subscription if it was already loaded (e.g. select_related),
+        # otherwise ask the index instead of building the row
+        if User.subscription.related.is_cached(self):
+            subscription = getattr(self, 'subscription', None)
+            return bool(subscription and subscription.status == 'active')
+        return Subscription.objects.filter(user_id=self.pk, status='active').exists()
 
     def __str__(self):
         return self.email
 
 
 class SubscriptionPlan(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=100)
     paystack_plan_id = models.CharField(max_length=100, unique=True)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -73,7 +87,7 @@ class SubscriptionPlan(models.Model):
 
 
 class Subscription(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     STATUS_CHOICES = [
         ('active', 'Active'),
         ('non-renewing', 'Non-Renewing'),
@@ -85,28 +99,52 @@ class Subscription(models.Model):
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='subscription')
     plan = models.ForeignKey(SubscriptionPlan, on_delete=models.SET_NULL, null=True, blank=True)
-    paystack_subscription_id = models.CharField(max_length=100, blank=True, null=True)
+    paystack_subscription_id = models.CharField(max_length=100, blank=True, null=True, db_index=True)
     paystack_email_token = models.CharField(max_length=255, blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='expired')
     next_payment_date = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # user_id is already unique, so is_pro's (user, status) lookup
+            # is covered; this serves "all active subscriptions" queries
+            models.Index(
+                fields=['status'],
+                condition=models.Q(status='active'),
+                name='sub_active_partial',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.email} - {self.status}"
 
 
 class PasswordResetOTP(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    otp = models.CharField(max_length=255)
+    # HMAC-SHA256 hex digest of the pin, see account.utils.hash_otp
+    otp_hash = models.CharField(max_length=64)
     attempts = models.PositiveIntegerField(default=0)
     reset_jti = models.CharField(max_length=500, blank=True, null=True)
-    expires_at = models.DateTimeField()
+    # indexed for the purge_expired_otps sweep
+    expires_at = models.DateTimeField(db_index=True)
     used = models.BooleanField(default=False)
     jti_used = models.BooleanField(default=False)
 
     MAX_ATTEMPTS = 5
 
+    class Meta:
+        indexes = [
+            # reset tokens are looked up by jti; burned rows are NULL and
+            # left out of the index
+            models.Index(
+                fields=['reset_jti'],
+                condition=models.Q(reset_jti__isnull=False),
+                name='pwreset_jti_active',
+            ),
+        ]
+
     def otp_valid(self):
         return (
             not self.used and
@@ -123,3 +161,16 @@ class PasswordResetOTP(models.Model):
     
     def __str__(self):
         return f" - OTP for {self.user.id}"
+
+
+class WebhookEvent(models.Model):
+    """
+    Paystack events already processed, so redelivered events are skipped
+    """
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    # indexed for the purge_webhook_events sweep
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.event_id
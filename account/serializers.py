@@ -1,11 +1,34 @@
 from django.conf import settings
-from django.contrib.auth.password_validation import validate_password
+from django.core.cache import cache
+from django.contrib.auth.password_validation import get_default_password_validators, validate_password
 from django.db import transaction
+from django.db.models import F, Q
+import hmac
 import uuid
 import jwt
 from rest_framework import serializers
 
 from account.models import PasswordResetOTP, User, SubscriptionPlan
+from account.utils import (
+    AUTH_USER_FIELDS,
+    BURNED_RESET_JTI,
+    RESET_TOKEN_LIFETIME,
+    get_otp_record_cached,
+    get_user_by_pk_cached,
+    hash_otp,
+    otp_cache_key,
+    reset_jti_cache_key,
+)
+
+_INTERNAL_JWT_SECRET = settings.INTERNAL_JWT_SECRET
+
+# AUTH_PASSWORD_VALIDATORS, instantiated once at import
+_PASSWORD_VALIDATORS = get_default_password_validators()
+
+# reset token decoding, set up once instead of on every request
+_reset_jwt = jwt.PyJWT()
+_RESET_JWT_ALGORITHMS = ("HS256",)
+_RESET_JWT_OPTIONS = {"require": ["exp", "jti", "purpose"]}
 
 
 # model serializers for users
@@ -36,13 +59,8 @@ class UserRegistrationSerializer(serializers.Serializer):
     business_name = serializers.CharField(max_length=255, required=False, allow_blank=True)
     business_description = serializers.CharField(required=False, allow_blank=True)
 
-    def validate_email(self, value):
-        """Validate that email is unique (will be used as username)"""
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Email already registered.")
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("Email already registered.")
-        return value
+    # Email uniqueness is not pre-checked here; the unique constraints on
+    # email and username reject duplicates when the user is inserted
 
     def validate(self, data):
         """Validate that passwords match"""
@@ -51,23 +69,50 @@ class UserRegistrationSerializer(serializers.Serializer):
         return data
 
 
+# bulk registration serializers
+class BulkRegistrationItemSerializer(UserRegistrationSerializer):
+    """
+    One row of a bulk registration payload.
+    Email uniqueness is checked for the whole batch in one query instead.
+    """
+
+
+class BulkUserRegistrationSerializer(serializers.Serializer):
+    """
+    Serializer for admin bulk onboarding of users (and optional businesses)
+    """
+    users = BulkRegistrationItemSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def validate_users(self, value):
+        # compare (and later store) emails the way create_user stores them
+        for row in value:
+            row['email'] = User.objects.normalize_email(row['email'])
+        emails = [row['email'] for row in value]
+        if len(set(emails)) != len(emails):
+            raise serializers.ValidationError("Duplicate emails in payload.")
+
+        requested = set(emails)
+        taken = set()
+        for email, username in User.objects.filter(
+            Q(email__in=emails) | Q(username__in=emails)
+        ).values_list('email', 'username'):
+            taken.update({email, username} & requested)
+        if taken:
+            raise serializers.ValidationError(
+                f"Email already registered: {', '.join(sorted(taken))}"
+            )
+        return value
+
+
 # password reset request serializer
 class PasswordResetRequestSerializer(serializers.Serializer):
     """
     Serializer for requesting a password reset
     """
+    # Existence is deliberately not checked here so the response does not
+    # reveal whether the account exists; the lookup happens in the worker
     email = serializers.EmailField()
 
-    def validate_email(self, value):
-        """
-        Validate that the email exists in the system
-        """
-        if not User.objects.filter(email=value).exists():
-            # Don't reveal that the email doesn't exist for security
-            # Just silently accept it
-            pass
-        return value
-
 
 # password reset OTP verification serializer
 class PasswordOTPVerifySerializer(serializers.Serializer):
@@ -78,27 +123,35 @@ class PasswordOTPVerifySerializer(serializers.Serializer):
         email = data["email"]
         otp = data["otp"]
 
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
+        # one JOIN (or a cache hit) for both the pin and its user; unknown
+        # emails get the same error so account existence is not leaked
+        record = get_otp_record_cached(email)
+        if record is None:
             raise serializers.ValidationError("Invalid reset pin.")
 
-        try:
-            record = PasswordResetOTP.objects.get(user=user)
-        except PasswordResetOTP.DoesNotExist:
-            raise serializers.ValidationError("Invalid reset pin.")
-
-        # Pure validation only
         if not record.otp_valid():
             raise serializers.ValidationError("OTP expired or already used.")
 
-        if not str(otp) == record.otp:
-            record.attempts += 1
-            record.save(update_fields=["attempts"])
+        # Count the guess in the table before checking it. The conditional
+        # UPDATE is the cap: concurrent guesses each take their own slot,
+        # so no more than MAX_ATTEMPTS + 1 pins are ever compared.
+        counted = PasswordResetOTP.objects.filter(
+            pk=record.pk,
+            used=False,
+            attempts__lte=PasswordResetOTP.MAX_ATTEMPTS,
+        ).update(attempts=F("attempts") + 1)
+        if not counted:
+            cache.delete(otp_cache_key(email))
+            raise serializers.ValidationError("OTP expired or already used.")
+
+        # constant time compare so pin prefixes cannot be timed
+        if not hmac.compare_digest(hash_otp(otp), record.otp_hash):
+            # the cached copy has a stale count now; the next try reads the table
+            cache.delete(otp_cache_key(email))
             raise serializers.ValidationError("Invalid reset pin.")
 
         # Store for save()
-        self.user = user
+        self.user = record.user
         self.record_id = record.id
 
         return data
@@ -111,6 +164,7 @@ class PasswordOTPVerifySerializer(serializers.Serializer):
             record = (
                 PasswordResetOTP.objects
                 .select_for_update()
+                .only("id", "used")
                 .get(pk=self.record_id)
             )
 
@@ -121,11 +175,17 @@ class PasswordOTPVerifySerializer(serializers.Serializer):
 
             record.used = True
             record.reset_jti = jti
-            record.save(update_fields=["used", "reset_jti"])
+            # a fresh token for this row; the previous reset may have burned it
+            record.jti_used = False
+            record.save(update_fields=["used", "reset_jti", "jti_used"])
+
+        # pin is burned; later attempts fall through to the table
+        cache.delete(otp_cache_key(self.user.email))
 
         return {
             "user": self.user,
             "jti": jti,
+            "record_id": record.pk,
         }
 
 
@@ -139,10 +199,11 @@ class PasswordResetSerializer(serializers.Serializer):
         token = data["jwt"]
 
         try:
-            payload = jwt.decode(
+            payload = _reset_jwt.decode(
                 token,
-                settings.INTERNAL_JWT_SECRET,
-                algorithms=["HS256"],
+                _INTERNAL_JWT_SECRET,
+                algorithms=_RESET_JWT_ALGORITHMS,
+                options=_RESET_JWT_OPTIONS,
             )
         except jwt.ExpiredSignatureError:
             raise serializers.ValidationError("Reset token expired.")
@@ -155,35 +216,52 @@ class PasswordResetSerializer(serializers.Serializer):
         if data["new_password"] != data["new_password_confirm"]:
             raise serializers.ValidationError("New passwords do not match.")
 
-        try:
-            otp_record = PasswordResetOTP.objects.get(
-                reset_jti=payload.get("jti")
-            )
-        except PasswordResetOTP.DoesNotExist:
-            raise serializers.ValidationError("Invalid or expired reset token.")
+        jti = payload["jti"]
+        claims = cache.get(reset_jti_cache_key(jti))
 
-        validate_password(data["new_password"], user=otp_record.user)
+        if claims == BURNED_RESET_JTI:
+            raise serializers.ValidationError("Invalid or expired reset token.")
 
-        self.otp_record = otp_record
-        self.user = otp_record.user
+        if claims:
+            # Token minted by password_otp_verify and not yet burned
+            record_pk = claims["record_id"]
+            user = get_user_by_pk_cached(claims["user_id"])
+            if user is None:
+                raise serializers.ValidationError("Invalid or expired reset token.")
+        else:
+            try:
+                otp_record = (
+                    PasswordResetOTP.objects
+                    .select_related("user")
+                    .only("id", "user_id", *(f"user__{f}" for f in AUTH_USER_FIELDS))
+                    .get(reset_jti=jti)
+                )
+            except PasswordResetOTP.DoesNotExist:
+                raise serializers.ValidationError("Invalid or expired reset token.")
+            record_pk = otp_record.pk
+            user = otp_record.user
+
+        validate_password(data["new_password"], user=user, password_validators=_PASSWORD_VALIDATORS)
+
+        self.otp_record_pk = record_pk
+        self.jti = jti
+        self.user = user
         return data
 
     def save(self):
         with transaction.atomic():
-            otp_record = (
-                PasswordResetOTP.objects
-                .select_for_update()
-                .get(pk=self.otp_record.pk)
-            )
-
-            # 🔐 burn the token
-            otp_record.reset_jti = None
-            otp_record.jti_used = True
-            otp_record.save(update_fields=["reset_jti", "jti_used"])
+            # 🔐 burn the token; the conditional UPDATE is the race guard,
+            # only one request can match the live jti
+            burned = PasswordResetOTP.objects.filter(
+                pk=self.otp_record_pk, reset_jti=self.jti, jti_used=False
+            ).update(reset_jti=None, jti_used=True)
+            if not burned:
+                raise serializers.ValidationError("Invalid or expired reset token.")
 
             self.user.set_password(self.validated_data["new_password"])
             self.user.save(update_fields=["password"])
 
+        cache.set(reset_jti_cache_key(self.jti), BURNED_RESET_JTI, timeout=RESET_TOKEN_LIFETIME)
         return self.user
     
 
@@ -202,7 +280,11 @@ class ChangePasswordSerializer(serializers.Serializer):
     def validate(self, data):
         if data["new_password"] != data["new_password_confirm"]:
             raise serializers.ValidationError("New passwords do not match.")
-        validate_password(data["new_password"], user=self.context['request'].user)
+        validate_password(
+            data["new_password"],
+            user=self.context['request'].user,
+            password_validators=_PASSWORD_VALIDATORS,
+        )
         return data
 
     def save(self):
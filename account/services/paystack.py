@@ -1,36 +1,78 @@
+import hashlib
+import hmac
+from decimal import ROUND_HALF_UP, Decimal
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 class PaystackService:
     BASE_URL = "https://api.paystack.co"
     SECRET_KEY = settings.PAYSTACK_SECRET_KEY
+    TIMEOUT = (3.05, 10)  # connect, read
+    # built once; the key does not change for the life of the process
+    HEADERS = {
+        "Authorization": f"Bearer {SECRET_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    # One keep-alive session per process so calls reuse the TLS connection.
+    # urllib3 only replays connect errors for POST; status retries apply
+    # to GETs, which are idempotent
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount(BASE_URL, HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        ),
+    ))
+
+    # keyed HMAC state for webhook signatures; copied per call so the key
+    # is only ingested once per process
+    _webhook_hmac = hmac.new(SECRET_KEY.encode('utf-8'), digestmod=hashlib.sha512)
 
     @classmethod
     def get_headers(cls):
-        return {
-            "Authorization": f"Bearer {cls.SECRET_KEY}",
-            "Content-Type": "application/json"
-        }
+        return cls.HEADERS
+
+    @classmethod
+    def verify_signature(cls, payload, signature):
+        """
+        Check the x-paystack-signature header against the raw request body
+        """
+        mac = cls._webhook_hmac.copy()
+        mac.update(payload)
+        # constant time compare so the signature cannot be probed byte by byte;
+        # compared as bytes since compare_digest rejects non-ascii str
+        return hmac.compare_digest(mac.hexdigest().encode(), signature.encode())
 
     @classmethod
     def initialize_transaction(cls, email, amount, plan_id=None, callback_url=None):
         url = f"{cls.BASE_URL}/transaction/initialize"
         payload = {
             "email": email,
-            "amount": int(amount * 100), # Paystack expects amount in Kobo
+            # Paystack expects amount in Kobo; rounded in Decimal so
+            # fractional naira never pass through float
+            "amount": int((Decimal(amount) * 100).to_integral_value(ROUND_HALF_UP)),
         }
         if plan_id:
             payload["plan"] = plan_id
         if callback_url:
             payload["callback_url"] = callback_url
         
-        response = requests.post(url, json=payload, headers=cls.get_headers())
+        response = cls.session.post(url, json=payload, timeout=cls.TIMEOUT)
         return response.json()
 
     @classmethod
     def verify_transaction(cls, reference):
         url = f"{cls.BASE_URL}/transaction/verify/{reference}"
-        response = requests.get(url, headers=cls.get_headers())
+        response = cls.session.get(url, timeout=cls.TIMEOUT)
         return response.json()
 
     @classmethod
@@ -41,5 +83,5 @@ class PaystackService:
             "first_name": user.first_name,
             "last_name": user.last_name,
         }
-        response = requests.post(url, json=payload, headers=cls.get_headers())
+        response = cls.session.post(url, json=payload, timeout=cls.TIMEOUT)
         return response.json()
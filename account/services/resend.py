@@ -0,0 +1,44 @@
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ResendService:
+    BASE_URL = "https://api.resend.com"
+    API_KEY = settings.RESEND_API_KEY
+    FROM_EMAIL = "onboarding@resend.dev"
+    # built once; the key does not change for the life of the process
+    HEADERS = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    # One keep-alive session per worker process so repeated sends reuse
+    # the same TCP + TLS connection instead of handshaking every time
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    # Only connection failures are retried here; once the request is on the
+    # wire, retrying is left to the celery task that called us
+    session.mount(BASE_URL, HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.2),
+    ))
+
+    @classmethod
+    def get_headers(cls):
+        return cls.HEADERS
+
+    @classmethod
+    def send_email(cls, to, subject, html):
+        url = f"{cls.BASE_URL}/emails"
+        payload = {
+            "from": cls.FROM_EMAIL,
+            "to": to,
+            "subject": subject,
+            "html": html,
+        }
+        response = cls.session.post(url, json=payload, timeout=10)
+        response.raise_for_status()
+        return response.json()
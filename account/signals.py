@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import SubscriptionPlan, User
+from .utils import invalidate_cached_plan, invalidate_cached_user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """
+    Drop cached lookups when a user is saved or deleted.
+    """
+    invalidate_cached_user(instance)
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+def plan_changed(sender, instance, **kwargs):
+    """
+    Drop cached plan lookups and the active plan list when a plan changes.
+    """
+    invalidate_cached_plan(instance)
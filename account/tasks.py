@@ -0,0 +1,255 @@
+import logging
+
+from datetime import timedelta
+
+import orjson
+import requests
+from celery import shared_task
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.template.loader import get_template
+
+from account.models import PasswordResetOTP, Subscription, SubscriptionPlan, User, WebhookEvent
+from account.services.paystack import PaystackService
+from account.services.resend import ResendService
+from account.utils import create_or_replace_otp, get_plan_by_code_cached, get_user_by_email_cached
+from bookkeeping.models import Business
+
+# prepare logging handler for this file
+logger = logging.getLogger(__name__)
+
+# email bodies, compiled once per worker process
+_WELCOME_TEMPLATE = get_template('account/emails/welcome.html')
+_PASSWORD_RESET_TEMPLATE = get_template('account/emails/password_reset.html')
+
+class TransientEmailError(Exception):
+    """A send that may work if tried again: connection trouble, timeout, 429 or 5xx"""
+
+
+def _is_transient(exc):
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(exc, 'response', None)
+    return response is not None and (response.status_code == 429 or response.status_code >= 500)
+
+
+# Resend outages and timeouts are retried with exponential backoff
+# instead of being dropped; other failures (bad API key, invalid
+# recipient) would fail the same way again, so they are not retried
+_EMAIL_RETRY = {
+    'autoretry_for': (TransientEmailError,),
+    'retry_backoff': True,
+    'max_retries': 5,
+}
+
+
+@shared_task(**_EMAIL_RETRY)
+def send_welcome_email(user_id):
+    """
+    Send the welcome email for a newly registered user
+    """
+    try:
+        user = User.objects.only('id', 'email', 'first_name').get(pk=user_id)
+    except User.DoesNotExist:
+        return
+
+    business = Business.objects.filter(user=user).first()
+    try:
+        ResendService.send_email(
+            to=user.email,
+            subject="Welcome to Dally Bookkeeping!",
+            html=_WELCOME_TEMPLATE.render({'user': user, 'business': business})
+        )
+    except requests.RequestException as e:
+        logger.warning("Resend: Sending email failed for %s: %s", user.email, e)
+        if _is_transient(e):
+            raise TransientEmailError(str(e)) from e
+        raise
+    logger.info("Resend: Email sent to %s successfully!", user.email)
+
+
+@shared_task(**_EMAIL_RETRY)
+def send_password_reset_otp(user_id, otp):
+    """
+    Send the six digit password reset pin to the user
+    """
+    try:
+        user = User.objects.only('id', 'username', 'email').get(pk=user_id)
+    except User.DoesNotExist:
+        return
+
+    _send_reset_email(user, otp)
+
+
+@shared_task
+def process_password_reset(email):
+    """
+    Create a reset pin and email it, if an account exists for this email.
+    Runs off the request so the response time does not reveal whether
+    the account exists.
+    """
+    user = get_user_by_email_cached(email)
+    if user is None:
+        return
+
+    otp = create_or_replace_otp(user)
+    # separate task so a failed send is retried without minting a new pin
+    send_password_reset_otp.delay(str(user.pk), otp)
+
+
+def _send_reset_email(user, otp):
+    try:
+        ResendService.send_email(
+            to=user.email,
+            subject="Password Reset Request - Dally Bookkeeping",
+            html=_PASSWORD_RESET_TEMPLATE.render({'user': user, 'otp': otp})
+        )
+    except requests.RequestException as e:
+        logger.error("Resend: Could not send email: %s", e)
+        if _is_transient(e):
+            raise TransientEmailError(str(e)) from e
+        raise
+    logger.info("Resend: Reset password pin sent to %s", user.email)
+
+
+@shared_task
+def purge_expired_otps():
+    """
+    Periodic sweep (celery beat) that deletes expired reset pins in one query.
+    Rows are kept for one extra token lifetime so a reset token minted just
+    before the pin expired can still be redeemed.
+    """
+    cutoff = timezone.now() - timedelta(minutes=10)
+    deleted, _ = PasswordResetOTP.objects.filter(expires_at__lt=cutoff).delete()
+    logger.info("Purged %d expired password reset pins", deleted)
+
+
+# Paystack does not redeliver an event once the webhook has answered 200,
+# so a failed run has to be retried here or the event is lost
+_WEBHOOK_RETRY = {
+    'autoretry_for': (DatabaseError, requests.RequestException),
+    'retry_backoff': True,
+    'max_retries': 8,
+}
+
+
+# Paystack redelivers an unacknowledged event for up to 72 hours; dedupe
+# records are kept a while past that, then purged
+WEBHOOK_EVENT_RETENTION = timedelta(days=7)
+
+
+@shared_task
+def purge_webhook_events():
+    """
+    Periodic sweep (celery beat) that deletes dedupe records for Paystack
+    events old enough that they can no longer be redelivered.
+    """
+    cutoff = timezone.now() - WEBHOOK_EVENT_RETENTION
+    deleted, _ = WebhookEvent.objects.filter(created_at__lt=cutoff).delete()
+    logger.info("Purged %d processed Paystack events", deleted)
+
+
+@shared_task(**_WEBHOOK_RETRY)
+def process_paystack_event(payload, signature):
+    """
+    Apply a Paystack webhook event. The view only checks the signature and
+    queues this, so Paystack gets its 200 without waiting on the DB writes.
+    """
+    # the signature is checked again in case the queue is not trusted
+    if not PaystackService.verify_signature(payload.encode('utf-8'), signature):
+        logger.warning("Paystack: dropping event with a bad signature")
+        return
+
+    event_data = orjson.loads(payload)
+    event_type = event_data.get('event')
+    data = event_data.get('data') or {}
+
+    # The dedupe record is written in the same transaction as the handler,
+    # so it only commits once the event has been applied; if the handler
+    # fails both roll back and the retry processes the event from scratch
+    with transaction.atomic():
+        if data.get('id') is not None:
+            _, created = WebhookEvent.objects.get_or_create(
+                event_id=f"{event_type}:{data['id']}",
+                defaults={'event_type': event_type or ''}
+            )
+            if not created:
+                logger.info("Paystack: skipping duplicate %s event", event_type)
+                return
+
+        handler = _PAYSTACK_EVENT_HANDLERS.get(event_type)
+        if handler:
+            handler(data)
+
+
+def _handle_subscription_create(data):
+    email = data['customer']['email']
+    try:
+        user = User.objects.only('id', 'email').get(email=email)
+        plan = get_plan_by_code_cached(data['plan']['plan_code'])
+        if plan is None:
+            raise SubscriptionPlan.DoesNotExist
+
+        Subscription.objects.update_or_create(
+            user=user,
+            defaults={
+                'plan': plan,
+                'paystack_subscription_id': data['subscription_code'],
+                'paystack_email_token': data['email_token'],
+                'status': 'active',
+                'next_payment_date': data['next_payment_date'],
+            }
+        )
+
+        logger.info("Subscription created for %s", user.email)
+    except (User.DoesNotExist, SubscriptionPlan.DoesNotExist):
+        pass
+
+
+def _set_subscription_status(data, status):
+    sub_code = data['subscription_code']
+    try:
+        subscription = Subscription.objects.get(paystack_subscription_id=sub_code)
+        subscription.status = status
+        subscription.save()
+    except Subscription.DoesNotExist:
+        pass
+
+
+def _handle_subscription_disable(data):
+    _set_subscription_status(data, 'cancelled')
+
+
+def _handle_subscription_not_renewing(data):
+    _set_subscription_status(data, 'non-renewing')
+
+
+def _handle_charge_success(data):
+    """
+    Direct payment success for non-plan payments or renewals
+    """
+    if not data.get('plan'): # only plan payments touch the subscription
+        return
+
+    email = data['customer']['email']
+    try:
+        user = User.objects.only('id', 'email').get(email=email)
+        plan = get_plan_by_code_cached(data['plan']['plan_code'])
+        if plan is None:
+            raise SubscriptionPlan.DoesNotExist
+
+        Subscription.objects.update_or_create(
+            user=user,
+            defaults={'plan': plan, 'status': 'active'}
+        )
+    except (User.DoesNotExist, SubscriptionPlan.DoesNotExist):
+        pass
+
+
+# Paystack event type -> handler taking the event's data dict
+_PAYSTACK_EVENT_HANDLERS = {
+    'subscription.create': _handle_subscription_create,
+    'subscription.disable': _handle_subscription_disable,
+    'subscription.not_renewing': _handle_subscription_not_renewing,
+    'charge.success': _handle_charge_success,
+}
@@ -1,3 +1,469 @@
+import hashlib
+import hmac
+from datetime import timedelta
+from unittest import mock
+
+import orjson
+import requests
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import DatabaseError
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_encode
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from account import tasks
+from account.apis import password_reset_verify
+from account.models import PasswordResetOTP, Subscription, SubscriptionPlan, User, WebhookEvent
+from account.serializers import BulkUserRegistrationSerializer, PasswordOTPVerifySerializer
+from account.utils import (
+    cache_otp_record,
+    create_or_replace_otp,
+    get_user_by_email_cached,
+    get_user_by_pk_cached,
+)
+
+
+class PasswordResetFlowTest(APITestCase):
+    """Pin -> reset token -> new password, through the public endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='reset@example.com',
+            username='reset@example.com',
+            password='Original-Passphrase-1'
+        )
+
+    def _reset_token(self):
+        otp = create_or_replace_otp(self.user)
+        response = self.client.post(reverse('password_otp_verify'), {
+            'email': self.user.email,
+            'otp': otp,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['reset_token']
+
+    def _confirm(self, token, password):
+        return self.client.post(reverse('password_reset_confirm'), {
+            'jwt': token,
+            'new_password': password,
+            'new_password_confirm': password,
+        })
+
+    def test_reset_password(self):
+        response = self._confirm(self._reset_token(), 'Second-Passphrase-2')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('Second-Passphrase-2'))
+
+    def test_two_resets_in_a_row(self):
+        first = self._confirm(self._reset_token(), 'Second-Passphrase-2')
+        second = self._confirm(self._reset_token(), 'Third-Passphrase-3')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('Third-Passphrase-3'))
+
+    def test_reset_token_is_single_use(self):
+        token = self._reset_token()
+        self._confirm(token, 'Second-Passphrase-2')
+
+        response = self._confirm(token, 'Third-Passphrase-3')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('Second-Passphrase-2'))
+
+    def test_new_pin_voids_unused_token(self):
+        token = self._reset_token()
+        create_or_replace_otp(self.user)
+
+        response = self._confirm(token, 'Second-Passphrase-2')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        record = PasswordResetOTP.objects.get(user=self.user)
+        self.assertIsNone(record.reset_jti)
+        self.assertFalse(record.jti_used)
+
+    def test_pin_with_leading_zeros(self):
+        with mock.patch('account.utils.secrets.randbelow', return_value=42):
+            otp = create_or_replace_otp(self.user)
+
+        response = self.client.post(reverse('password_otp_verify'), {
+            'email': self.user.email,
+            'otp': otp,
+        })
+
+        self.assertEqual(otp, '000042')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_wrong_pin_is_rejected(self):
+        create_or_replace_otp(self.user)
+
+        response = self.client.post(reverse('password_otp_verify'), {
+            'email': self.user.email,
+            'otp': 'not-the-pin',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(PasswordResetOTP.objects.get(user=self.user).attempts, 1)
+
+    def test_errors_are_flattened(self):
+        response = self.client.post(reverse('password_reset_confirm'), {
+            'jwt': self._reset_token(),
+            'new_password': 'Second-Passphrase-2',
+            'new_password_confirm': 'Different-Passphrase-2',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'status': 'error', 'message': 'New passwords do not match.'})
+
+    def test_pin_locks_after_max_attempts(self):
+        otp = create_or_replace_otp(self.user)
+        stale = PasswordResetOTP.objects.select_related('user').get(user=self.user)
+        for _ in range(PasswordResetOTP.MAX_ATTEMPTS + 1):
+            serializer = PasswordOTPVerifySerializer(data={'email': self.user.email, 'otp': 'wrong'})
+            self.assertFalse(serializer.is_valid())
+
+        # a copy cached before the guesses, as a concurrent request would see it
+        cache_otp_record(stale)
+        serializer = PasswordOTPVerifySerializer(data={'email': self.user.email, 'otp': otp})
+
+        self.assertFalse(serializer.is_valid())
+
+
+class RegisterTest(APITestCase):
+    """Single signups"""
+
+    def setUp(self):
+        cache.clear()
+
+    def _register(self, email='new@example.com'):
+        return self.client.post(reverse('register'), {
+            'email': email,
+            'password': 'Signup-Passphrase-1',
+            'password_confirm': 'Signup-Passphrase-1',
+        })
+
+    def test_broker_failure_does_not_fail_signup(self):
+        with mock.patch.object(tasks.send_welcome_email, 'delay', side_effect=OSError('broker down')) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._register()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        delay.assert_called_once()
+        self.assertTrue(User.objects.filter(email='new@example.com').exists())
+
+    def test_duplicate_email_leaves_outer_transaction_usable(self):
+        self._register()
+
+        # the test case wraps this in an outer atomic, like ATOMIC_REQUESTS
+        response = self._register()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(User.objects.filter(email='new@example.com').count(), 1)
+
+
+class BulkRegisterTest(APITestCase):
+    """Admin bulk onboarding"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@example.com',
+            username='admin@example.com',
+            password='Admin-Passphrase-1',
+            is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+    def _row(self, email, **extra):
+        return {
+            'email': email,
+            'password': 'Bulk-Passphrase-1',
+            'password_confirm': 'Bulk-Passphrase-1',
+            **extra,
+        }
+
+    def _post(self, rows):
+        return self.client.post(reverse('bulk_register'), {'users': rows}, format='json')
+
+    def test_creates_users_and_businesses(self):
+        response = self._post([
+            self._row('one@example.com', business_name='One Ltd'),
+            self._row('two@example.com'),
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['users_created'], 2)
+        self.assertEqual(response.data['businesses_created'], 1)
+        user = User.objects.get(email='one@example.com')
+        self.assertTrue(user.check_password('Bulk-Passphrase-1'))
+        self.assertEqual(user.business.get().name, 'One Ltd')
+
+    def test_duplicate_emails_in_payload(self):
+        response = self._post([self._row('dup@example.com'), self._row('dup@example.com')])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email='dup@example.com').exists())
+
+    def test_existing_email_rejects_whole_batch(self):
+        response = self._post([self._row('fresh@example.com'), self._row(self.admin.email)])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email='fresh@example.com').exists())
+
+    def test_existing_email_with_different_domain_case(self):
+        response = self._post([self._row('admin@EXAMPLE.com')])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(User.objects.filter(email='admin@example.com').count(), 1)
+
+    def test_duplicates_in_payload_after_normalizing(self):
+        response = self._post([self._row('dup@example.com'), self._row('dup@EXAMPLE.COM')])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email='dup@example.com').exists())
+
+    def test_account_created_after_validation(self):
+        # the pre-check passes, then a concurrent signup takes the email
+        User.objects.create_user(email='race@example.com', username='race@example.com')
+
+        with mock.patch.object(BulkUserRegistrationSerializer, 'validate_users', lambda self, value: value):
+            response = self._post([self._row('race@example.com')])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(User.objects.filter(email='race@example.com').count(), 1)
+
+    def test_password_mismatch(self):
+        response = self._post([self._row('one@example.com', password_confirm='Other-Passphrase-1')])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email='one@example.com').exists())
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(User.objects.create_user(
+            email='plain@example.com', username='plain@example.com', password='Plain-Passphrase-1'
+        ))
+
+        response = self._post([self._row('one@example.com')])
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class UserCacheTest(APITestCase):
+    """Cached user lookups used by the auth flows"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@example.com',
+            username='admin@example.com',
+            password='Admin-Passphrase-1',
+            is_staff=True
+        )
+
+    def test_cached_user_has_no_password_hash(self):
+        get_user_by_email_cached(self.admin.email)
+
+        cached = cache.get(f"user:email:{self.admin.email}")
+
+        self.assertIn('password', cached.get_deferred_fields())
+
+    def test_bulk_register_clears_cached_miss(self):
+        self.assertIsNone(get_user_by_email_cached('bulk@example.com'))
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.post(reverse('bulk_register'), {'users': [{
+            'email': 'bulk@example.com',
+            'password': 'Bulk-Passphrase-1',
+            'password_confirm': 'Bulk-Passphrase-1',
+        }]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(get_user_by_email_cached('bulk@example.com').email, 'bulk@example.com')
+
+    def test_pk_lookups_are_cached_per_alias(self):
+        with mock.patch('account.utils.User.objects.using') as using:
+            using.return_value.filter.return_value.only.return_value.first.return_value = None
+            self.assertIsNone(get_user_by_pk_cached(self.admin.pk, using='replica'))
+
+        # a lagging replica's miss is not served to the primary path
+        self.assertEqual(get_user_by_pk_cached(self.admin.pk), self.admin)
+
+    def test_save_clears_every_alias(self):
+        with mock.patch.dict(settings.DATABASES, {'replica': settings.DATABASES['default']}):
+            cache.set(f"user:pk:replica:{self.admin.pk}", None)
+            cache.set(f"user:pk:default:{self.admin.pk}", None)
+
+            self.admin.save()
+
+            self.assertFalse(cache.has_key(f"user:pk:replica:{self.admin.pk}"))
+            self.assertFalse(cache.has_key(f"user:pk:default:{self.admin.pk}"))
+
+    def test_reset_link_check_reads_password_on_access(self):
+        get_user_by_pk_cached(self.admin.pk)
+        token = default_token_generator.make_token(self.admin)
+        uid = urlsafe_base64_encode(str(self.admin.pk).encode())
+
+        request = APIRequestFactory().get('/')
+        response = password_reset_verify(request, uid=uid, token=token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class EmailRetryTest(TestCase):
+    """Which Resend failures the email tasks retry"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='mail@example.com',
+            username='mail@example.com',
+            password='Mail-Passphrase-1'
+        )
+
+    def _http_error(self, status_code):
+        response = requests.Response()
+        response.status_code = status_code
+        return requests.HTTPError(response=response)
+
+    def _send(self, *errors):
+        with mock.patch.object(tasks.ResendService, 'send_email', side_effect=[*errors, {'id': 'sent'}]) as send:
+            result = tasks.send_welcome_email.apply(args=(str(self.user.pk),))
+        return result, send.call_count
+
+    def test_transient_failures_are_retried(self):
+        for error in (requests.ConnectionError(), requests.Timeout(), self._http_error(503), self._http_error(429)):
+            with self.subTest(error=error):
+                result, calls = self._send(error)
+
+                self.assertTrue(result.successful())
+                self.assertEqual(calls, 2)
+
+    def test_client_errors_are_not_retried(self):
+        for status_code in (401, 422):
+            with self.subTest(status_code=status_code):
+                result, calls = self._send(self._http_error(status_code))
+
+                self.assertTrue(result.failed())
+                self.assertEqual(calls, 1)
+
+
+class PaystackEventTest(TestCase):
+    """process_paystack_event dedupe and retries"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='payer@example.com',
+            username='payer@example.com',
+            password='Payer-Passphrase-1'
+        )
+        SubscriptionPlan.objects.create(
+            name='Pro', paystack_plan_id='PLN_pro', amount='5000.00', interval='monthly'
+        )
+        self.payload = orjson.dumps({
+            'event': 'charge.success',
+            'data': {
+                'id': 1001,
+                'customer': {'email': self.user.email},
+                'plan': {'plan_code': 'PLN_pro'},
+            },
+        }).decode()
+        self.signature = hmac.new(
+            settings.PAYSTACK_SECRET_KEY.encode(), self.payload.encode(), hashlib.sha512
+        ).hexdigest()
+
+    def _run(self):
+        return tasks.process_paystack_event.apply(args=(self.payload, self.signature))
+
+    def _fail_first(self, times):
+        real = tasks._handle_charge_success
+        calls = []
+
+        def handler(data):
+            calls.append(data)
+            if len(calls) <= times:
+                raise DatabaseError('connection lost')
+            real(data)
+
+        patcher = mock.patch.dict(tasks._PAYSTACK_EVENT_HANDLERS, {'charge.success': handler})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+    def test_event_is_applied_once(self):
+        self._run()
+        Subscription.objects.filter(user=self.user).update(status='cancelled')
+
+        self._run()
+
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.assertEqual(Subscription.objects.get(user=self.user).status, 'cancelled')
+
+    def test_failed_event_is_retried(self):
+        calls = self._fail_first(1)
+
+        result = self._run()
+
+        self.assertTrue(result.successful())
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(Subscription.objects.get(user=self.user).status, 'active')
+        self.assertTrue(WebhookEvent.objects.filter(event_id='charge.success:1001').exists())
+
+    def test_failure_does_not_record_event(self):
+        self._fail_first(tasks.process_paystack_event.max_retries + 1)
+
+        result = self._run()
+
+        self.assertTrue(result.failed())
+        self.assertFalse(WebhookEvent.objects.exists())
+        self.assertFalse(Subscription.objects.filter(user=self.user).exists())
+
+    def test_bad_signature_is_dropped(self):
+        self.signature = '0' * 128
+
+        self._run()
+
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_webhook_queues_signed_events(self):
+        with mock.patch.object(tasks.process_paystack_event, 'delay') as delay:
+            response = self.client.post(
+                reverse('paystack_webhook'), self.payload,
+                content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE=self.signature
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        delay.assert_called_once_with(self.payload, self.signature)
+
+    def test_webhook_rejects_signed_non_utf8_body(self):
+        body = b'\xff\xfe not json'
+        signature = hmac.new(settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512).hexdigest()
+
+        with mock.patch.object(tasks.process_paystack_event, 'delay') as delay:
+            response = self.client.post(
+                reverse('paystack_webhook'), body,
+                content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE=signature
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        delay.assert_not_called()
+
+    def test_old_events_are_purged(self):
+        old = WebhookEvent.objects.create(event_id='charge.success:1', event_type='charge.success')
+        recent = WebhookEvent.objects.create(event_id='charge.success:2', event_type='charge.success')
+        WebhookEvent.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - tasks.WEBHOOK_EVENT_RETENTION - timedelta(minutes=1)
+        )
+
+        tasks.purge_webhook_events()
 
-# Create your tests here.
+        self.assertEqual(list(WebhookEvent.objects.values_list('pk', flat=True)), [recent.pk])
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.views import (
 
 from .apis import (
     register,
+    bulk_register,
     password_reset_request,
     password_reset_confirm,
     password_otp_verify,
@@ -19,6 +20,7 @@ from .apis import (
 
 urlpatterns = [
     path('register/', register, name='register'),
+    path('register/bulk/', bulk_register, name='bulk_register'),
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('password-reset/', password_reset_request, name='password_reset_request'),
@@ -1,27 +1,176 @@
-import random 
+import hashlib
+import hmac
+import secrets
 from datetime import timedelta
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
 from django.utils import timezone
-from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 from rest_framework.throttling import AnonRateThrottle
 
 
-from account.models import PasswordResetOTP
+from account.models import PasswordResetOTP, SubscriptionPlan, User
+
+USER_CACHE_TIMEOUT = 60
+PLAN_CACHE_TIMEOUT = 60
+ACTIVE_PLANS_CACHE_KEY = "plans:active:v1"
+RESET_TOKEN_LIFETIME = 600  # seconds
+
+# alias for read-only lookups that can tolerate replication lag
+REPLICA_DB_ALIAS = 'replica' if 'replica' in settings.DATABASES else DEFAULT_DB_ALIAS
+
+_OTP_HASH_KEY = settings.SECRET_KEY.encode()
+
+# Columns needed by the auth flows that use the cached lookups below
+# (token checks, reset emails, password validation and set_password).
+# The password hash is left out so it never lands in the shared cache;
+# the one caller that reads it (reset link checks) loads it on access.
+AUTH_USER_FIELDS = ('id', 'email', 'username', 'last_login', 'first_name', 'last_name')
+
+# Columns needed to check a reset pin and burn it
+OTP_VERIFY_FIELDS = ('id', 'user_id', 'otp_hash', 'attempts', 'used', 'expires_at')
+
+
+def get_user_by_email_cached(email):
+    """
+    Fetch a user by email, served from cache for a short while.
+    Returns None if no user has this email.
+    """
+    return cache.get_or_set(
+        f"user:email:{email}",
+        lambda: User.objects.filter(email=email).only(*AUTH_USER_FIELDS).first(),
+        USER_CACHE_TIMEOUT
+    )
+
+
+def get_user_by_pk_cached(pk, using=DEFAULT_DB_ALIAS):
+    """
+    Fetch a user by primary key, served from cache for a short while.
+    Returns None if the user does not exist; that miss is cached too.
+    """
+    # keyed per alias: a replica miss from replication lag must not be
+    # served to primary callers, nor replica-loaded instances
+    return cache.get_or_set(
+        f"user:pk:{using}:{pk}",
+        lambda: User.objects.using(using).filter(pk=pk).only(*AUTH_USER_FIELDS).first(),
+        USER_CACHE_TIMEOUT
+    )
+
+
+def invalidate_cached_users(users):
+    """
+    Drop cached lookups, including cached misses, for these users.
+    Call it after bulk writes, which do not send post_save.
+    """
+    keys = []
+    for user in users:
+        keys.append(f"user:email:{user.email}")
+        keys.extend(f"user:pk:{alias}:{user.pk}" for alias in settings.DATABASES)
+    cache.delete_many(keys)
+
+
+def invalidate_cached_user(user):
+    invalidate_cached_users([user])
+
+
+def get_plan_by_code_cached(plan_code):
+    """
+    Fetch a subscription plan by its Paystack plan code, served from cache.
+    Returns None if no plan has this code.
+    """
+    return cache.get_or_set(
+        f"plan:code:{plan_code}",
+        lambda: SubscriptionPlan.objects.filter(paystack_plan_id=plan_code).first(),
+        PLAN_CACHE_TIMEOUT
+    )
+
+
+def invalidate_cached_plan(plan):
+    cache.delete_many([f"plan:code:{plan.paystack_plan_id}", ACTIVE_PLANS_CACHE_KEY])
+
+
+def reset_jti_cache_key(jti):
+    return f"pwreset:jti:{jti}"
+
+
+# cached under reset_jti_cache_key once a token is redeemed, so replays are
+# rejected without a DB lookup until the token would have expired anyway
+BURNED_RESET_JTI = "burned"
+
+
+def otp_cache_key(email):
+    return f"otp:{email}"
+
+
+def cache_otp_record(record):
+    """
+    Keep a copy of the user's live reset pin (with its user) in cache until
+    it expires, so verifying it does not have to read the tables.
+    """
+    ttl = int((record.expires_at - timezone.now()).total_seconds())
+    if ttl > 0:
+        cache.set(otp_cache_key(record.user.email), record, timeout=ttl)
+
+
+def get_otp_record_cached(email):
+    """
+    Return the PasswordResetOTP for this email with its user joined in,
+    from cache when possible. Returns None if there is no such pin.
+    """
+    record = cache.get(otp_cache_key(email))
+    if record is None:
+        record = (
+            PasswordResetOTP.objects
+            .select_related('user')
+            .only(*OTP_VERIFY_FIELDS, *(f'user__{f}' for f in AUTH_USER_FIELDS))
+            .filter(user__email=email)
+            .first()
+        )
+        if record is not None and record.otp_valid():
+            cache_otp_record(record)
+    return record
+
+
+def hash_otp(otp):
+    """
+    Keyed hash of a reset pin for storage. A fast HMAC rather than a
+    password hasher, since pins are short lived and attempts are capped.
+    """
+    return hmac.new(_OTP_HASH_KEY, otp.encode(), hashlib.sha256).hexdigest()
+
 
 def create_or_replace_otp(user):
-    otp = random.randint(100000, 999999)
+    # pins are handled as strings end to end, matching the serializer field;
+    # the padding keeps pins below 100000 (e.g. "000042") six digits long
+    otp = f"{secrets.randbelow(10**6):06d}"
     expires_at = timezone.now() + timedelta(minutes=10)
 
-    PasswordResetOTP.objects.update_or_create(
+    # single INSERT ... ON CONFLICT (user_id) DO UPDATE instead of a
+    # SELECT followed by an INSERT or UPDATE
+    record = PasswordResetOTP(
         user=user,
-        defaults={
-            "otp": str(otp),
-            "attempts": 0,
-            "used": False,
-            "expires_at": expires_at,
-        }
+        otp_hash=hash_otp(otp),
+        attempts=0,
+        used=False,
+        reset_jti=None,
+        jti_used=False,
+        expires_at=expires_at,
+    )
+    # a new pin also voids any reset token minted from the previous one
+    PasswordResetOTP.objects.bulk_create(
+        [record],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["otp_hash", "attempts", "used", "reset_jti", "jti_used", "expires_at"],
     )
+    cache_otp_record(record)
     return otp
 
 
 class OTPVerifyThrottle(AnonRateThrottle):
     rate = "3/min"
+
+
+class RegisterThrottle(AnonRateThrottle):
+    scope = "register"
+    rate = "5/min"
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class AdminDashboardConfig(AppConfig):
     name = 'admin_dashboard'
     verbose_name = 'Admin Dashboard'
+
+    def ready(self):
+        import admin_dashboard.signals
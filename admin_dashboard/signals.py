@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from account.models import Subscription
+from bookkeeping.models import Transaction
+from .utils import increment_count_cache_version
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def list_rows_changed(sender, instance, **kwargs):
+    """
+    Drop cached list counts for the model when one of its rows changes.
+    """
+    increment_count_cache_version(sender)
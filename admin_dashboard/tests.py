@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from account.models import User
+from bookkeeping.models import Business
+
+
+class KeysetListTest(TestCase):
+    """Cursor walks over the users and businesses lists"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com',
+            username='admin@example.com',
+            password='Admin-Passphrase-1',
+            is_staff=True
+        )
+        # many rows share a timestamp so the pk tie-breaker is exercised
+        now = timezone.now()
+        stamps = [now - timedelta(hours=i // 7) for i in range(45)]
+        users = User.objects.bulk_create([
+            User(email=f'user{i:02}@example.com', username=f'user{i:02}@example.com', date_joined=stamp)
+            for i, stamp in enumerate(stamps)
+        ])
+        businesses = Business.objects.bulk_create([
+            Business(user=user, name=f'Shop {i:02}') for i, user in enumerate(users)
+        ])
+        for business, stamp in zip(businesses, stamps):
+            Business.objects.filter(pk=business.pk).update(created_at=stamp)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def _walk(self, url, key, params=None):
+        pages = []
+        cursor = None
+        while True:
+            response = self.client.get(url, {**(params or {}), **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            page = response.context[key]
+            pages.append([row.pk for row in page])
+            if not page.has_next:
+                return pages, page
+            cursor = page.next_cursor
+
+    def _walk_back(self, url, key, page):
+        rows = []
+        while page.has_previous:
+            page = self.client.get(url, {'cursor': page.previous_cursor}).context[key]
+            rows = [row.pk for row in page] + rows
+        return rows
+
+    def _assert_complete(self, url, key, queryset, field):
+        pages, last = self._walk(url, key)
+        rows = [pk for page in pages for pk in page]
+        expected = list(queryset.order_by(f'-{field}', '-pk').values_list('pk', flat=True))
+
+        self.assertEqual(rows, expected)
+        self.assertTrue(all(len(page) <= 20 for page in pages))
+        self.assertEqual(self._walk_back(url, key, last), rows[:-len(pages[-1])])
+
+    def test_users_walk_has_no_gaps_or_duplicates(self):
+        self._assert_complete(
+            reverse('admin_dashboard:users_list'), 'users', User.objects.all(), 'date_joined'
+        )
+
+    def test_businesses_walk_has_no_gaps_or_duplicates(self):
+        self._assert_complete(
+            reverse('admin_dashboard:businesses_list'), 'businesses', Business.objects.all(), 'created_at'
+        )
+
+    def test_filtered_walk(self):
+        pages, _ = self._walk(reverse('admin_dashboard:users_list'), 'users', {'search': 'user1'})
+        rows = [pk for page in pages for pk in page]
+
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(len(set(rows)), 10)
+
+    def test_bad_cursor_returns_first_page(self):
+        response = self.client.get(reverse('admin_dashboard:users_list'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['users'].has_previous)
@@ -1,14 +1,27 @@
 from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse
+from django.http import HttpResponse
 from django.utils import timezone
-from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.views.decorators.cache import cache_control
 from django.db.models import Count, Sum, Q
 from django.db.models.functions import TruncDay, TruncWeek
 from django.contrib import messages
 from datetime import timedelta
+import orjson
 from account.models import User, Subscription, SubscriptionPlan
 from bookkeeping.models import Business, Transaction
+from admin_dashboard.utils import (
+    EXPORT_CHUNK_SIZE,
+    LIST_PAGE_SIZE,
+    CachedCountPaginator,
+    get_count_cached,
+    stream_csv,
+)
+from dally.pagination import keyset_paginate
+
+DASHBOARD_METRICS_CACHE_KEY = "admin_dashboard:metrics:v1"
+DASHBOARD_METRICS_TIMEOUT = 60  # seconds
 
 
 # ============================================
@@ -22,28 +35,54 @@ def dashboard(request):
 
 
 @staff_member_required
+@cache_control(private=True, max_age=30)
 def metrics_json(request):
     data = get_dashboard_metrics()
-    return JsonResponse(data)
+    # orjson handles the datetimes natively; Decimals fall back to str,
+    # and OPT_UTC_Z keeps the same "Z" suffix DjangoJSONEncoder produced
+    return HttpResponse(
+        orjson.dumps(data, default=str, option=orjson.OPT_UTC_Z),
+        content_type='application/json'
+    )
 
 
 def get_dashboard_metrics():
+    """
+    Platform-wide counters for the dashboard, shared by all staff and
+    recomputed at most once a minute.
+    """
+    return cache.get_or_set(
+        DASHBOARD_METRICS_CACHE_KEY,
+        _compute_dashboard_metrics,
+        DASHBOARD_METRICS_TIMEOUT
+    )
+
+
+def _compute_dashboard_metrics():
     now = timezone.now()
     last_30 = now - timedelta(days=30)
-    today = now.date()
-    month_start = now.replace(day=1)
+    # plain ranges on created_at instead of __date, so the index is usable
+    today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = today_start.replace(day=1)
 
-    total_users = User.objects.count()
-    active_users = User.objects.filter(last_login__gte=last_30).count()
+    # Counters are folded into one conditional aggregate per table
+    users = User.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(last_login__gte=last_30)),
+    )
     total_businesses = Business.objects.count()
-    total_transactions = Transaction.objects.count()
-    transactions_today = Transaction.objects.filter(created_at__date=today).count()
-    transactions_month = Transaction.objects.filter(created_at__gte=month_start).count()
-    total_revenue = Transaction.objects.aggregate(total=Sum('total_amount'))['total'] or 0
+    transactions = Transaction.objects.aggregate(
+        total=Count('id'),
+        today=Count('id', filter=Q(created_at__gte=today_start, created_at__lt=today_start + timedelta(days=1))),
+        month=Count('id', filter=Q(created_at__gte=month_start)),
+        revenue=Sum('total_amount'),
+    )
 
     # Subscription breakdown
-    free_count = Subscription.objects.filter(plan__name="Free").count()
-    paid_count = Subscription.objects.filter(plan__name="Pro").count()
+    subscriptions = Subscription.objects.aggregate(
+        free=Count('id', filter=Q(plan__name="Free")),
+        paid=Count('id', filter=Q(plan__name="Pro")),
+    )
 
     # New signups
     signups_daily = list(User.objects.annotate(day=TruncDay('date_joined'))
@@ -53,7 +92,7 @@ def get_dashboard_metrics():
 
     # Recent activity
     recent_users = list(User.objects.order_by('-date_joined').values('id', 'email', 'date_joined')[:10])
-    recent_transactions = list(Transaction.objects.select_related('business').order_by('-created_at')
+    recent_transactions = list(Transaction.objects.order_by('-created_at')
         .values('id', 'total_amount', 'created_at', 'business__name')[:10])
 
     # Daily transactions for bar chart
@@ -61,14 +100,14 @@ def get_dashboard_metrics():
         .values('day').annotate(count=Count('id')).order_by('-day')[:14])
 
     return {
-        'total_users': total_users,
-        'active_users': active_users,
+        'total_users': users['total'],
+        'active_users': users['active'],
         'total_businesses': total_businesses,
-        'total_transactions': total_transactions,
-        'transactions_today': transactions_today,
-        'transactions_month': transactions_month,
-        'total_revenue': total_revenue,
-        'subscription_breakdown': {'free': free_count, 'paid': paid_count},
+        'total_transactions': transactions['total'],
+        'transactions_today': transactions['today'],
+        'transactions_month': transactions['month'],
+        'total_revenue': transactions['revenue'] or 0,
+        'subscription_breakdown': subscriptions,
         'signups_daily': signups_daily,
         'signups_weekly': signups_weekly,
         'transactions_daily': transactions_daily,
@@ -83,7 +122,7 @@ def get_dashboard_metrics():
 
 @staff_member_required
 def users_list(request):
-    users = User.objects.all().order_by('-date_joined')
+    users = User.objects.all()
     
     # Search
     search = request.GET.get('search', '')
@@ -99,31 +138,45 @@ def users_list(request):
     elif status_filter == 'staff':
         users = users.filter(is_staff=True)
     
+    # Export streams every matching row instead of one page
+    if request.GET.get('export') == 'csv':
+        fields = ['id', 'email', 'username', 'first_name', 'last_name', 'is_active', 'is_staff', 'date_joined']
+        rows = users.order_by('-date_joined', '-id').values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return stream_csv('users.csv', fields, rows)
+    
     # Pagination
-    paginator = Paginator(users, 20)
-    page = request.GET.get('page', 1)
-    users_page = paginator.get_page(page)
+    users_page = keyset_paginate(users, request.GET.get('cursor'), 'date_joined', LIST_PAGE_SIZE)
     
     context = {
         'users': users_page,
         'search': search,
         'status_filter': status_filter,
-        'total_count': paginator.count,
+        'total_count': get_count_cached('users', User.objects.all()),
+        # only count the filtered set when there is a filter
+        'filtered_count': users.count() if search or status_filter else None,
     }
     return render(request, 'admin_dashboard/users_list.html', context)
 
 
 @staff_member_required
 def user_detail(request, pk):
-    user = get_object_or_404(User, pk=pk)
-    businesses = Business.objects.filter(user=user)
-    transactions_count = Transaction.objects.filter(user=user).count()
+    # subscription, plan and transaction count come back with the user row
+    user = get_object_or_404(
+        User.objects.select_related('subscription__plan')
+        .annotate(transactions_count=Count('transactions')),
+        pk=pk
+    )
+    businesses = (
+        Business.objects.filter(user=user)
+        .only('id', 'name', 'created_at')
+        .order_by('created_at')
+    )
     subscription = getattr(user, 'subscription', None)
     
     context = {
         'user_obj': user,
         'businesses': businesses,
-        'transactions_count': transactions_count,
+        'transactions_count': user.transactions_count,
         'subscription': subscription,
     }
     return render(request, 'admin_dashboard/user_detail.html', context)
@@ -146,9 +199,11 @@ def user_toggle_active(request, pk):
 
 @staff_member_required
 def businesses_list(request):
-    businesses = Business.objects.select_related('user').annotate(
+    businesses = Business.objects.select_related('user').only(
+        'id', 'name', 'description', 'created_at', 'user__id', 'user__email'
+    ).annotate(
         tx_count=Count('transactions')
-    ).order_by('-created_at')
+    )
     
     # Search
     search = request.GET.get('search', '')
@@ -157,15 +212,20 @@ def businesses_list(request):
             Q(name__icontains=search) | Q(user__email__icontains=search)
         )
     
+    # Export streams every matching row instead of one page
+    if request.GET.get('export') == 'csv':
+        fields = ['id', 'name', 'user__email', 'tx_count', 'created_at']
+        rows = businesses.order_by('-created_at', '-id').values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return stream_csv('businesses.csv', fields, rows)
+    
     # Pagination
-    paginator = Paginator(businesses, 20)
-    page = request.GET.get('page', 1)
-    businesses_page = paginator.get_page(page)
+    businesses_page = keyset_paginate(businesses, request.GET.get('cursor'), 'created_at', LIST_PAGE_SIZE)
     
     context = {
         'businesses': businesses_page,
         'search': search,
-        'total_count': paginator.count,
+        'total_count': get_count_cached('businesses', Business.objects.all()),
+        'filtered_count': businesses.count() if search else None,
     }
     return render(request, 'admin_dashboard/businesses_list.html', context)
 
@@ -199,7 +259,7 @@ def transactions_list(request):
         transactions = transactions.filter(date__lte=date_to)
     
     # Pagination
-    paginator = Paginator(transactions, 25)
+    paginator = CachedCountPaginator(transactions, 25)
     page = request.GET.get('page', 1)
     transactions_page = paginator.get_page(page)
     
@@ -241,21 +301,23 @@ def subscriptions_list(request):
         subscriptions = subscriptions.filter(plan__name__iexact=plan_filter)
     
     # Pagination
-    paginator = Paginator(subscriptions, 20)
+    paginator = CachedCountPaginator(subscriptions, 20)
     page = request.GET.get('page', 1)
     subscriptions_page = paginator.get_page(page)
     
-    # Stats
-    active_count = Subscription.objects.filter(status='active').count()
-    total_count = Subscription.objects.count()
+    # Stats, both counts in one pass over the table
+    stats = Subscription.objects.aggregate(
+        total_count=Count('id'),
+        active_count=Count('id', filter=Q(status='active')),
+    )
     plans = SubscriptionPlan.objects.all()
     
     context = {
         'subscriptions': subscriptions_page,
         'status_filter': status_filter,
         'plan_filter': plan_filter,
-        'active_count': active_count,
-        'total_count': total_count,
+        'active_count': stats['active_count'],
+        'total_count': stats['total_count'],
         'plans': plans,
     }
     return render(request, 'admin_dashboard/subscriptions_list.html', context)
@@ -1,3 +1,4 @@
+import logging
 import os
 from decimal import Decimal
 from urllib.parse import urlencode
@@ -5,7 +6,7 @@ from rest_framework import status
 from django.conf import settings
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Max, Min, Prefetch, Q
 from datetime import datetime, date, timedelta
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
@@ -19,7 +20,7 @@ from reportlab.lib import colors
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from django.http import FileResponse
-from io import BytesIO
+from tempfile import SpooledTemporaryFile
 from datetime import datetime
 from rest_framework.generics import ListAPIView, CreateAPIView
 
@@ -40,21 +41,46 @@ from rest_framework.views import APIView
 from django.core.cache import cache
 from django.utils.dateparse import parse_date
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from dally.pagination import KeysetPagination
 from rest_framework import generics
 
+logger = logging.getLogger(__name__)
 
 
-def get_user_cache_version(user_id):
+# Dashboard and summary entries are invalidated by the version bump in
+# bookkeeping.signals on every write, so they can live long; the TTL only
+# clears out entries for versions and days that are no longer read
+SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Last cache version this process saw per user, used to guess the data key
+_seen_cache_versions = {}
+_SEEN_CACHE_VERSIONS_MAX = 10000
+
+
+def get_user_cached(user_id, key_for):
     """
-    Get the current cache version for a user, initializing it if it doesn't exist.
+    Look up a per-user cached response keyed by the user's cache version.
+    Returns (version, cached data or None), where key_for(version) builds
+    the data key. The version and the data for the version this process
+    saw last are fetched in one get_many; a second lookup only happens
+    when the version has moved on since.
     """
     version_key = f'user_cache_version:{user_id}'
-    version = cache.get(version_key)
+    guess = _seen_cache_versions.get(user_id, 1)
+    found = cache.get_many([version_key, key_for(guess)])
+
+    version = found.get(version_key)
     if version is None:
         version = 1
         cache.set(version_key, version, timeout=None)
-    return version
+
+    if len(_seen_cache_versions) >= _SEEN_CACHE_VERSIONS_MAX:
+        _seen_cache_versions.clear()
+    _seen_cache_versions[user_id] = version
+
+    if version == guess:
+        return version, found.get(key_for(guess))
+    return version, cache.get(key_for(version))
 
 
 class DashboardView(APIView):
@@ -62,58 +88,70 @@ class DashboardView(APIView):
 
     def get(self, request):
         user = request.user
-        version = get_user_cache_version(user.id)
-        cach_key = f'dashboard:{user.id}:v{version}'
-        cached_data = cache.get(cach_key)
+        # today/week/month are relative to the date, so it is part of the key
+        def key_for(v):
+            return f'dashboard:{user.id}:v{v}:{date.today()}'
+        version, cached_data = get_user_cached(user.id, key_for)
+        cach_key = key_for(version)
         if cached_data:
             return Response(cached_data)
         
         base_qs = Transaction.objects.filter(user=request.user, is_deleted=False)
         today = date.today()
+        periods = {
+            "transactions_today": Q(date=today),
+            "transactions_week": Q(date__gte=today - timedelta(days=7)),
+            "transactions_month": Q(date__gte=today - timedelta(days=30)),
+        }
 
-        def summarize(qs):
-            income = qs.filter(transaction_type='income').aggregate(
-                total=Sum('total_amount'),
-                count=Count('id')
-            )
-            expense = qs.filter(transaction_type='expense').aggregate(
-                total=Sum('total_amount'),
-                count=Count('id')
-            )
-
-            total_income = income['total'] or 0
-            total_expense = expense['total'] or 0
+        # every period's income/expense total and count in one query
+        aggregates = {}
+        for period, in_period in periods.items():
+            for tx_type in ('income', 'expense'):
+                matches = in_period & Q(transaction_type=tx_type)
+                aggregates[f'{period}_{tx_type}_total'] = Sum('total_amount', filter=matches)
+                aggregates[f'{period}_{tx_type}_count'] = Count('id', filter=matches)
+        totals = base_qs.aggregate(**aggregates)
+
+        def summarize(period):
+            total_income = totals[f'{period}_income_total'] or 0
+            total_expense = totals[f'{period}_expense_total'] or 0
+            income_count = totals[f'{period}_income_count']
+            expense_count = totals[f'{period}_expense_count']
 
             return {
                 'income': {
                     'total': total_income,
-                    'count': income['count'],
+                    'count': income_count,
                 },
                 'expense': {
                     'total': total_expense,
-                    'count': expense['count'],
+                    'count': expense_count,
                 },
                 'net': total_income - total_expense,
-                'total_transactions': income['count'] + expense['count'],
+                'total_transactions': income_count + expense_count,
             }
 
         business = Business.objects.filter(user=request.user).first()
         data = {
             "business": BusinessSerializer(business).data if business else None,
-            "transactions_today": summarize(base_qs.filter(date=today)),
-            "transactions_week": summarize(base_qs.filter(date__gte=date.today()-timedelta(days=7))),
-            "transactions_month": summarize(base_qs.filter(date__gte=date.today()-timedelta(days=30))),
+            **{period: summarize(period) for period in periods},
         }
-        cache.set(cach_key, data, timeout=300)
+        cache.set(cach_key, data, timeout=SUMMARY_CACHE_TIMEOUT)
         return Response(data)
 
 
-class TransactionPagination(PageNumberPagination):
+class TransactionPagination(KeysetPagination):
+    """
+    Keyset pagination on (date, id), newest first: each page seeks past
+    the cursor row instead of OFFSETting, even within a busy day.
+    """
     page_size = 20
+    ordering_field = 'date'
 
 @extend_schema(
     summary="List transactions (cached, paginated)",
-    description="Get a paginated list of transactions for the authenticated user. Supports filtering by type, start_date, and end_date. Results are cached for 60 seconds.",
+    description="Get a cursor-paginated list of transactions for the authenticated user, newest first. Supports filtering by type, start_date, and end_date. Follow the next/previous links to page. Results are cached for 60 seconds.",
     tags=["Dashboard - Transactions"],
     parameters=[
         OpenApiParameter(
@@ -133,9 +171,9 @@ class TransactionPagination(PageNumberPagination):
             description='Filter transactions until this date (YYYY-MM-DD)'
         ),
         OpenApiParameter(
-            name='page',
-            type=OpenApiTypes.INT,
-            description='Page number for pagination'
+            name='cursor',
+            type=OpenApiTypes.STR,
+            description='Opaque cursor taken from the next/previous links'
         ),
     ],
     responses={200: TransactionListSerializer(many=True)},
@@ -146,11 +184,13 @@ class TransactionView(APIView):
     def get(self, request):
         user = request.user
         params = request.query_params.dict()
-        version = get_user_cache_version(user.id)
+        query = urlencode(sorted(params.items()))
         # Create a unique cache key based on user, query params and version
-        cache_key = f"transaction_list:{user.id}:v{version}:{urlencode(sorted(params.items()))}"
+        def key_for(v):
+            return f"transaction_list:{user.id}:v{v}:{query}"
+        version, cached_data = get_user_cached(user.id, key_for)
+        cache_key = key_for(version)
 
-        cached_data = cache.get(cache_key)
         if cached_data:
             return Response(cached_data)
 
@@ -185,12 +225,23 @@ class TransactionView(APIView):
             queryset = queryset.filter(date__lte=end_date)
 
         paginator = TransactionPagination()
-        page = paginator.paginate_queryset(queryset, request)
+        # plain dicts are enough for a read-only list; skip building model instances
+        page = paginator.paginate_queryset(
+            queryset.values(*TransactionListSerializer.Meta.fields), request
+        )
 
         serializer = TransactionListSerializer(page, many=True)
 
+        # the total is the same on every page, so count once per filter set
+        filters = urlencode(sorted((k, v) for k, v in params.items() if k != 'cursor'))
+        count = cache.get_or_set(
+            f"transaction_count:{user.id}:v{version}:{filters}", queryset.count, timeout=60
+        )
+
         response_data = {
-            "count": paginator.page.paginator.count,
+            "count": count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
             "results": serializer.data
         }
 
@@ -203,32 +254,29 @@ class SummaryView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         user = request.user
-        version = get_user_cache_version(user.id)
-        cache_key = f'summary:{user.id}:v{version}'
-        cached_data = cache.get(cache_key)  
+        def key_for(v):
+            return f'summary:{user.id}:v{v}:{date.today()}'
+        version, cached_data = get_user_cached(user.id, key_for)
+        cache_key = key_for(version)
         if cached_data:
             return Response(cached_data)
         
         base_qs = Transaction.objects.filter(user=request.user, is_deleted=False)
-        # overall highs and lows
-        highest_income = base_qs.filter(transaction_type='income').order_by('-total_amount').first()
-        lowest_income = base_qs.filter(transaction_type='income').order_by('total_amount').first()
-        highest_expense = base_qs.filter(transaction_type='expense').order_by('-total_amount').first()
-        lowest_expense = base_qs.filter(transaction_type='expense').order_by('total_amount').first()
-        # weekly highs and lows
-        highest_weekly_income = base_qs.filter(
-            transaction_type='income', 
-            date__gte=date.today()-timedelta(days=7)).order_by('-total_amount').first()
-        lowest_weekly_income = base_qs.filter(
-            transaction_type='income',
-            date__gte=date.today()-timedelta(days=7)).order_by('total_amount').first()
-        highest_weekly_expense = base_qs.filter(
-            transaction_type='expense', 
-            date__gte=date.today()-timedelta(days=7)).order_by('-total_amount').first()
-        lowest_weekly_expense = base_qs.filter(
-            transaction_type='expense',
-            date__gte=date.today()-timedelta(days=7)).order_by('total_amount').first()
-       
+        # overall and weekly highs and lows in a single pass
+        income = Q(transaction_type='income')
+        expense = Q(transaction_type='expense')
+        this_week = Q(date__gte=date.today()-timedelta(days=7))
+        extremes = base_qs.aggregate(
+            highest_income=Max('total_amount', filter=income),
+            lowest_income=Min('total_amount', filter=income),
+            highest_expense=Max('total_amount', filter=expense),
+            lowest_expense=Min('total_amount', filter=expense),
+            highest_weekly_income=Max('total_amount', filter=income & this_week),
+            lowest_weekly_income=Min('total_amount', filter=income & this_week),
+            highest_weekly_expense=Max('total_amount', filter=expense & this_week),
+            lowest_weekly_expense=Min('total_amount', filter=expense & this_week),
+        )
+
         top_categories = (
         TransactionItem.objects
             .filter(transaction__in=base_qs)
@@ -237,19 +285,13 @@ class SummaryView(APIView):
             .order_by('-count')[:3]      # Order descending and take top 3
         )
         data = {
-            "highest_income": highest_income.total_amount if highest_income else 0,
-            "lowest_income": lowest_income.total_amount if lowest_income else 0,
-            "highest_expense": highest_expense.total_amount if highest_expense else 0,
-            "lowest_expense": lowest_expense.total_amount if lowest_expense else 0,
-            "highest_weekly_income": highest_weekly_income.total_amount if highest_weekly_income else 0,
-            "lowest_weekly_income": lowest_weekly_income.total_amount if lowest_weekly_income else 0,
-            "highest_weekly_expense": highest_weekly_expense.total_amount if highest_weekly_expense else 0,
-            "lowest_weekly_expense": lowest_weekly_expense.total_amount if lowest_weekly_expense else 0,
+            # no matching transactions reads as 0, as before
+            **{key: 0 if value is None else value for key, value in extremes.items()},
             "top_categories": [
                 {"category": item["category"], "count": item["count"]} for item in top_categories
             ],
         }
-        cache.set(cache_key, data, timeout=300)  # Cache for 5 minutes
+        cache.set(cache_key, data, timeout=SUMMARY_CACHE_TIMEOUT)
         return Response(data)
 
 
@@ -410,6 +452,40 @@ class TransactionCreateView(generics.CreateAPIView):
 
 
 
+# Register the Unicode font once per process; parsing the TTF on every
+# export was pure overhead since ReportLab keeps it globally anyway
+_FONT_PATH = os.path.join(settings.BASE_DIR, 'staticfiles', 'fonts', 'DejaVuSans.ttf')
+try:
+    pdfmetrics.registerFont(TTFont('DejaVu', _FONT_PATH))
+except Exception:
+    logger.exception("Could not register PDF font %s", _FONT_PATH)
+
+# Styles are the same for every report and only read while building,
+# so they are set up once instead of per request
+_PDF_STYLES = getSampleStyleSheet()
+_PDF_STYLES["Normal"].fontName = "DejaVu"
+_PDF_STYLES["Heading1"].fontName = "DejaVu"
+_PDF_STYLES["Heading2"].fontName = "DejaVu"
+
+_SUMMARY_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 1, colors.grey),
+    ("FONTNAME", (0, 0), (-1, -1), "DejaVu"),
+    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+])
+
+_TX_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("FONTNAME", (0, 0), (-1, -1), "DejaVu"),
+    ("ALIGN", (3, 1), (-1, -1), "RIGHT"),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+])
+
+PDF_SPOOL_MAX_SIZE = 1024 * 1024  # bytes
+PDF_EXPORT_CHUNK_SIZE = 500
+
+
 class TransactionPDFExportView(APIView):
     """
     Export filtered transactions as a detailed PDF report for the logged-in business owner.
@@ -432,7 +508,12 @@ class TransactionPDFExportView(APIView):
         queryset = Transaction.objects.filter(
             user=request.user,
             is_deleted=False
-        ).select_related('business', 'user').prefetch_related('items')
+        ).only(
+            'id', 'date', 'transaction_type', 'description', 'total_amount'
+        ).prefetch_related(Prefetch(
+            'items',
+            queryset=TransactionItem.objects.only('transaction_id', 'description', 'category', 'amount'),
+        ))
 
         # Filter by transaction type
         tx_type = params.get('type')
@@ -454,21 +535,8 @@ class TransactionPDFExportView(APIView):
                 queryset = queryset.filter(date__lte=parsed_end)
 
         # PDF Generation
-        FONT_PATH = os.path.join(
-            settings.BASE_DIR,
-            'staticfiles',
-            "fonts",
-            "DejaVuSans.ttf"
-        )
-        
-        # Register Unicode font
-        try:
-            pdfmetrics.registerFont(TTFont('DejaVu', FONT_PATH))
-        except Exception:
-            # Font might be already registered
-            pass
-
-        buffer = BytesIO()
+        # small reports stay in memory, large ones spill to a temp file
+        buffer = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE, mode='w+b')
         doc = SimpleDocTemplate(
             buffer,
             pagesize=A4,
@@ -478,10 +546,7 @@ class TransactionPDFExportView(APIView):
             bottomMargin=40
         )
 
-        styles = getSampleStyleSheet()
-        styles["Normal"].fontName = "DejaVu"
-        styles["Heading1"].fontName = "DejaVu"
-        styles["Heading2"].fontName = "DejaVu"
+        styles = _PDF_STYLES
 
         elements = []
 
@@ -497,15 +562,13 @@ class TransactionPDFExportView(APIView):
         elements.append(Spacer(1, 20))
 
         # ================= SUMMARY TABLE =================
-        income_agg = queryset.filter(transaction_type='income').aggregate(
-            total=Sum('total_amount')
-        )
-        income = income_agg['total'] or Decimal('0.00')
-
-        expense_agg = queryset.filter(transaction_type='expense').aggregate(
-            total=Sum('total_amount')
+        # both totals in one pass over the filtered rows
+        totals = queryset.aggregate(
+            income=Sum('total_amount', filter=Q(transaction_type='income')),
+            expense=Sum('total_amount', filter=Q(transaction_type='expense')),
         )
-        expense = expense_agg['total'] or Decimal('0.00')
+        income = totals['income'] or Decimal('0.00')
+        expense = totals['expense'] or Decimal('0.00')
 
         net = income - expense
 
@@ -517,12 +580,7 @@ class TransactionPDFExportView(APIView):
         ]
 
         summary_table = Table(summary_data, colWidths=[200, 200])
-        summary_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 1, colors.grey),
-            ("FONTNAME", (0, 0), (-1, -1), "DejaVu"),
-            ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-        ]))
+        summary_table.setStyle(_SUMMARY_TABLE_STYLE)
 
         elements.append(Paragraph("<b>Summary</b>", styles["Heading2"]))
         elements.append(summary_table)
@@ -536,7 +594,9 @@ class TransactionPDFExportView(APIView):
             ["Date", "Type", "Description", "Amount (₦)"]
         ]
 
-        for tx in queryset.order_by("-date"):
+        # read in chunks, each with its own items prefetch, rather than
+        # holding every transaction instance at once
+        for tx in queryset.order_by("-date").iterator(chunk_size=PDF_EXPORT_CHUNK_SIZE):
             tx_table_data.append([
                 tx.date.strftime("%Y-%m-%d"),
                 tx.get_transaction_type_display(),
@@ -554,13 +614,7 @@ class TransactionPDFExportView(APIView):
                 ])
 
         tx_table = Table(tx_table_data, colWidths=[70, 70, 230, 90])
-        tx_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("FONTNAME", (0, 0), (-1, -1), "DejaVu"),
-            ("ALIGN", (3, 1), (-1, -1), "RIGHT"),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ]))
+        tx_table.setStyle(_TX_TABLE_STYLE)
 
         elements.append(tx_table)
 
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:41
+
+import dally.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookkeeping', '0004_alter_transaction_business'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='business',
+            name='id',
+            field=models.UUIDField(default=dally.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='id',
+            field=models.UUIDField(default=dally.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='transactionitem',
+            name='id',
+            field=models.UUIDField(default=dally.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookkeeping', '0007_business_user_created_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['created_at', 'id'], name='bookkeeping_created_71092c_idx'),
+        ),
+    ]
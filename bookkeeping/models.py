@@ -1,15 +1,15 @@
-import uuid
 from django.db import models
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
 from account.models import User
+from dally.ids import uuid7
 
 class Business(models.Model):
     """
     Business model - one user has one business
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='business')
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -20,6 +20,8 @@ class Business(models.Model):
         verbose_name_plural = 'Businesses'
         indexes = [
             models.Index(fields=['user']),
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['created_at', 'id']),
         ]
 
     def __str__(self):
@@ -41,7 +43,7 @@ class Transaction(models.Model):
         ('inventory', 'Inventory Purchase'),      # Stock/goods purchased for resale
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transactions')
     business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='transactions', blank=True, null=True)
     transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
@@ -66,10 +68,23 @@ class Transaction(models.Model):
     class Meta:
         ordering = ['-date', '-created_at']
         indexes = [
-            models.Index(fields=['user', 'date']),
+            # user-facing queries always exclude soft-deleted rows, so these
+            # are partial: per-user date filters and the (date, id) keyset paging,
+            # and the same with a type filter
+            models.Index(
+                fields=['user', '-date', '-id'],
+                condition=models.Q(is_deleted=False),
+                name='tx_active_user_date',
+            ),
+            models.Index(
+                fields=['user', 'transaction_type', '-date'],
+                condition=models.Q(is_deleted=False),
+                name='tx_active_user_type_date',
+            ),
             models.Index(fields=['business', 'date']),
             models.Index(fields=['user', 'is_deleted']),
             models.Index(fields=['transaction_type']),
+            models.Index(fields=['created_at']),
         ]
 
     def __str__(self):
@@ -130,7 +145,7 @@ class TransactionItem(models.Model):
     """
     Line items for each transaction
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     transaction = models.ForeignKey(
         Transaction, 
         on_delete=models.CASCADE, 
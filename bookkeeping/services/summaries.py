@@ -9,7 +9,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 from django.db.models import Sum, Q
 from django.contrib.auth.models import User
-from bookkeeping.models import Transaction, TransactionItem
+from bookkeeping.models import Business, Transaction, TransactionItem
 from bookkeeping.models import InventoryPeriod
 
 
@@ -176,15 +176,12 @@ def profit_and_loss(user: User, start_date: date, end_date: date, business_id=No
     # If business_id is passed, use it. If not, try to find user's business.
     # If neither, we are in "Individual Mode" -> No COGS, simple Income - Expense.
     if not business_id:
-        try:
-            # We strictly check if they have a business link
-            # But here `queryset` is already filtered by user.
-            # If we want to support multiple businesses later, we might need more logic.
-            # For now, if no business_id is passed, we check if the user has ANY business.
-            user_business = Business.objects.filter(user=user).first()
-            business_id = user_business.id if user_business else None
-        except Exception:
-            business_id = None
+        # We strictly check if they have a business link
+        # But here `queryset` is already filtered by user.
+        # If we want to support multiple businesses later, we might need more logic.
+        # For now, if no business_id is passed, we check if the user has ANY business.
+        # .first() returns None rather than raising, so no try/except is needed
+        business_id = Business.objects.filter(user=user).values_list('id', flat=True).first()
 
     if not business_id:
         # --- INDIVIDUAL MODE (No Business) ---
@@ -1,7 +1,7 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.cache import cache
-from .models import Transaction, TransactionItem
+from .models import Business, Transaction, TransactionItem
 
 def increment_user_cache_version(user_id):
     """
@@ -30,3 +30,11 @@ def transaction_item_changed(sender, instance, **kwargs):
     """
     if instance.transaction and instance.transaction.user:
         increment_user_cache_version(instance.transaction.user.id)
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+def business_changed(sender, instance, **kwargs):
+    """
+    Clear cache when a business changes; the dashboard embeds it.
+    """
+    increment_user_cache_version(instance.user_id)
@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
@@ -6,7 +7,9 @@ from django.utils.encoding import force_bytes
 from rest_framework.test import APITestCase
 from rest_framework import status
 from decimal import Decimal
-from .models import Business, Transaction, TransactionItem
+from datetime import date
+from .models import Business, InventoryPeriod, Transaction, TransactionItem
+from .services.summaries import profit_and_loss
 
 
 class BusinessModelTest(TestCase):
@@ -421,3 +424,62 @@ class PasswordRecoveryTest(APITestCase):
             'new_password_confirm': 'differentpassword'
         })
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProfitAndLossTest(TestCase):
+    """Individual vs business (COGS) mode in profit_and_loss"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='pnl@example.com',
+            username='pnl@example.com',
+            password='Pnl-Passphrase-1'
+        )
+        self.start = date(2026, 3, 1)
+        self.end = date(2026, 3, 31)
+        for tx_type, expense_type, amount in [
+            ('income', None, '1000.00'),
+            ('expense', 'inventory', '300.00'),
+            ('expense', 'operating', '100.00'),
+            ('expense', None, '50.00'),
+        ]:
+            Transaction.objects.create(
+                user=self.user,
+                transaction_type=tx_type,
+                expense_type=expense_type,
+                date=date(2026, 3, 10),
+                total_amount=Decimal(amount)
+            )
+
+    def _add_business(self):
+        business = Business.objects.create(user=self.user, name='Stock Shop')
+        InventoryPeriod.objects.create(business=business, period_end=date(2026, 2, 28), closing_value=Decimal('200.00'))
+        InventoryPeriod.objects.create(business=business, period_end=self.end, closing_value=Decimal('100.00'))
+        return business
+
+    def test_individual_mode_without_business(self):
+        result = profit_and_loss(self.user, self.start, self.end)
+
+        self.assertEqual(result['cogs'], Decimal('0.00'))
+        self.assertEqual(result['operating_expenses'], Decimal('450.00'))
+        self.assertEqual(result['net_profit'], Decimal('550.00'))
+
+    def test_business_mode_uses_the_users_business(self):
+        self._add_business()
+
+        result = profit_and_loss(self.user, self.start, self.end)
+
+        # opening 200 + purchases 300 - closing 100
+        self.assertEqual(result['cogs'], Decimal('400.00'))
+        self.assertEqual(result['operating_expenses'], Decimal('150.00'))
+        self.assertEqual(result['gross_profit'], Decimal('600.00'))
+        self.assertEqual(result['net_profit'], Decimal('450.00'))
+
+    def test_business_mode_with_explicit_business(self):
+        business = self._add_business()
+        Transaction.objects.filter(user=self.user).update(business=business)
+
+        result = profit_and_loss(self.user, self.start, self.end, business_id=business.id)
+
+        self.assertEqual(result['cogs'], Decimal('400.00'))
+        self.assertEqual(result['net_profit'], Decimal('450.00'))
@@ -0,0 +1,18 @@
+"""
+Celery config for dally project.
+
+Workers are started with:
+    celery -A dally worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dally.settings')
+
+app = Celery('dally')
+
+# Read all CELERY_* keys from Django settings
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,35 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+def first_error(errors):
+    """
+    Pick a single human readable message out of serializer errors
+    """
+    if isinstance(errors, list):
+        return str(errors[0]) if errors else 'Invalid input.'
+    value = errors.get('non_field_errors') or next(iter(errors.values()), ['Invalid input.'])
+    return str(value[0]) if isinstance(value, list) else str(value)
+
+
+def flat_validation_errors(view):
+    """
+    Render validation errors raised by this @api_view as
+    {"status": "error", "message": "..."} instead of the field -> errors dict.
+    Goes above @api_view so it can mark the generated view class.
+    """
+    view.cls.flat_validation_errors = True
+    return view
+
+
+def exception_handler(exc, context):
+    response = drf_exception_handler(exc, context)
+
+    if (
+        response is not None
+        and isinstance(exc, ValidationError)
+        and getattr(context.get('view'), 'flat_validation_errors', False)
+    ):
+        response.data = {"status": "error", "message": first_error(response.data)}
+
+    return response
@@ -0,0 +1,19 @@
+import os
+import time
+import uuid
+
+
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7) for primary keys.
+    The leading 48 bits are the unix time in milliseconds, so new rows land
+    at the right edge of the primary key index instead of a random page.
+    """
+    ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                        # version
+    value |= ((rand >> 62) & 0xFFF) << 64     # rand_a
+    value |= 0b10 << 62                       # variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF     # rand_b
+    return uuid.UUID(int=value)
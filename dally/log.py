@@ -0,0 +1,51 @@
+import logging
+import os
+import queue
+import weakref
+from logging.handlers import QueueHandler, QueueListener
+
+# live handlers, so the fork hook below can reach them
+_handlers = weakref.WeakSet()
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Formats records on the calling thread, then hands them to a background
+    thread that writes them to stderr, so request threads never wait on
+    the stream.
+    """
+
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self._start_listener()
+        _handlers.add(self)
+
+    def _start_listener(self):
+        self._listener = QueueListener(self.queue, logging.StreamHandler())
+        self._listener.start()
+
+    def _restart_in_child(self):
+        # the parent's writer thread did not survive the fork; build a new
+        # queue and listener rather than reuse them (records still queued
+        # at fork time belong to the parent)
+        self.queue = queue.SimpleQueue()
+        self._start_listener()
+
+    def close(self):
+        # logging.shutdown() closes every handler at exit, which drains the
+        # queue; guarded since close() may be called more than once
+        if self in _handlers:
+            _handlers.discard(self)
+            self._listener.stop()
+        super().close()
+
+
+def _restart_listeners():
+    for handler in list(_handlers):
+        handler._restart_in_child()
+
+
+# threads do not survive fork (celery prefork, gunicorn --preload), so each
+# child needs its own writers or records would pile up unwritten.
+# Registered once here; fork hooks cannot be unregistered.
+os.register_at_fork(after_in_child=_restart_listeners)
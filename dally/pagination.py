@@ -0,0 +1,131 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPage:
+    """
+    One page of a keyset paginated list, newest first.
+    Iterates like a list; the cursors are passed back as ?cursor=...
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _encode_cursor(direction, row, field, pk_name):
+    # rows are model instances, or dicts when paging a values() queryset
+    if isinstance(row, dict):
+        value, pk = row[field], row[pk_name]
+    else:
+        value, pk = getattr(row, field), row.pk
+    raw = f"{direction}|{value.isoformat()}|{pk}"
+    return urlsafe_base64_encode(raw.encode())
+
+
+def _decode_cursor(queryset, cursor, field):
+    opts = queryset.model._meta
+    try:
+        direction, value, pk = urlsafe_base64_decode(cursor).decode().split('|')
+        return direction, opts.get_field(field).to_python(value), opts.pk.to_python(pk)
+    except (ValueError, UnicodeDecodeError, ValidationError):
+        return None
+
+
+def keyset_paginate(queryset, cursor, field, limit):
+    """
+    Page through queryset ordered by (-field, -pk), seeking past the cursor
+    row instead of counting and OFFSETting, so every page costs the same.
+    An invalid or missing cursor returns the first page.
+    """
+    decoded = _decode_cursor(queryset, cursor, field) if cursor else None
+
+    if decoded and decoded[0] == 'prev':
+        # walk backwards from the cursor, then flip the rows back
+        _, value, pk = decoded
+        rows = list(
+            queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+            .order_by(field, 'pk')[:limit + 1]
+        )
+        has_previous, rows = len(rows) > limit, rows[:limit]
+        rows.reverse()
+        has_next = True
+    else:
+        if decoded:
+            _, value, pk = decoded
+            queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+        rows = list(queryset.order_by(f'-{field}', '-pk')[:limit + 1])
+        has_next, rows = len(rows) > limit, rows[:limit]
+        has_previous = decoded is not None
+
+    if not rows:
+        return KeysetPage(rows)
+    pk_name = queryset.model._meta.pk.attname
+    return KeysetPage(
+        rows,
+        next_cursor=_encode_cursor('next', rows[-1], field, pk_name) if has_next else None,
+        previous_cursor=_encode_cursor('prev', rows[0], field, pk_name) if has_previous else None,
+    )
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination over keyset_paginate, ordered by (-ordering_field, -pk).
+    Unlike CursorPagination, whose cursor holds only the first ordering
+    field plus an offset, the cursor here pins the exact (field, pk) row,
+    so pages over many equal field values still cost one index seek.
+    """
+    page_size = 20
+    ordering_field = None
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page = keyset_paginate(
+            queryset,
+            request.query_params.get(self.cursor_query_param),
+            self.ordering_field,
+            self.page_size,
+        )
+        return list(self.page)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
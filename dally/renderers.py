@@ -0,0 +1,21 @@
+from decimal import Decimal
+
+import orjson
+from drf_orjson_renderer.renderers import ORJSONRenderer
+
+
+class JSONRenderer(ORJSONRenderer):
+    """
+    orjson-backed renderer that keeps DRF's wire format for raw Decimals
+    and datetimes (e.g. aggregate totals or timestamps put straight into
+    a Response). Serializer fields are unaffected since they already emit strings.
+    """
+    # errors from nested many=True serializers are keyed by row index;
+    # UTC datetimes end in 'Z' like DRF's encoder, not '+00:00'
+    options = ORJSONRenderer.options | orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    @staticmethod
+    def default(obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return ORJSONRenderer.default(obj)
@@ -0,0 +1,22 @@
+from django.db import DEFAULT_DB_ALIAS
+
+
+class PrimaryReplicaRouter:
+    """
+    Installed only when a replica is configured. Reads stay on default
+    unless a query explicitly asks for the replica; writes and migrations
+    always go to default, even for objects that were loaded from the replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 from decouple import config, Csv
@@ -100,6 +101,32 @@ else:
         }
     }
 
+# Optional read replica. Nothing reads from it implicitly; only lookups that
+# ask for it with .using('replica') do, and the router keeps all writes on default.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default=None)
+
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL)
+    DATABASE_ROUTERS = ['dally.routers.PrimaryReplicaRouter']
+
+# Cache
+# Uses Redis when REDIS_URL is set, otherwise falls back to local memory
+REDIS_URL = config('REDIS_URL', default=None)
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -118,6 +145,43 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# Tests (and local setups that opt in) use a cheap hasher; everything else uses argon2.
+# PBKDF2 stays in the list so existing hashes still verify and get upgraded on login.
+FAST_PASSWORD_HASHER = 'test' in sys.argv or config('FAST_PASSWORD_HASHER', default=False, cast=bool)
+
+PASSWORD_HASHERS = [
+    'account.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+if FAST_PASSWORD_HASHER:
+    PASSWORD_HASHERS.insert(0, 'django.contrib.auth.hashers.MD5PasswordHasher')
+
+
+# Logging
+# App loggers write through a queue so the stderr write happens off the request thread
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'standard': {
+            'format': '%(asctime)s %(levelname)s %(name)s: %(message)s',
+        },
+    },
+    'handlers': {
+        'queue': {
+            'class': 'dally.log.QueueStreamHandler',
+            'formatter': 'standard',
+        },
+    },
+    'loggers': {
+        app: {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False}
+        for app in ('account', 'bookkeeping', 'admin_dashboard', 'main', 'dally')
+    },
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -160,9 +224,14 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'dally.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'EXCEPTION_HANDLER': 'dally.exceptions.exception_handler',
 }
 
 # Simple JWT settings
@@ -204,6 +273,31 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
 # Resend API Key
 RESEND_API_KEY = config('RESEND_API_KEY', default='')
 
+# Celery (background jobs such as transactional emails)
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default=None)
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+CELERY_TASK_IGNORE_RESULT = True
+# Enqueueing happens on the request path (register, password reset), so keep
+# a slow or unreachable broker from holding the worker for long
+CELERY_BROKER_CONNECTION_TIMEOUT = 2
+CELERY_TASK_PUBLISH_RETRY_POLICY = {
+    'max_retries': 2,
+    'interval_start': 0,
+    'interval_step': 0.2,
+    'interval_max': 0.5,
+}
+CELERY_BEAT_SCHEDULE = {
+    'purge-expired-otps': {
+        'task': 'account.tasks.purge_expired_otps',
+        'schedule': timedelta(minutes=5),
+    },
+    'purge-webhook-events': {
+        'task': 'account.tasks.purge_webhook_events',
+        'schedule': timedelta(hours=6),
+    },
+}
+
 
 AUTH_USER_MODEL = 'account.User'
 